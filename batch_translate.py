@@ -0,0 +1,256 @@
+"""命令行批量翻译
+
+不依赖 PyQt5 等图形界面组件，可在无图形界面的服务器上运行。
+
+用法示例:
+    python batch_translate.py input.txt -o output.txt --engine baidu --workers 2
+    python batch_translate.py input.jsonl -o output.jsonl --field text
+    python batch_translate.py input.csv -o output.csv --column source
+    python batch_translate.py input.txt -o output.txt --race baidu,youdao --hedge-delay 0.5
+    python batch_translate.py input.txt -o output.txt --engine baidu --workers 4 --multi-tab
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlsplit
+
+from text_chunker import translate_document
+from translation_cache import TranslationCache
+from translation_job import TranslationJob
+from translation_race import HedgedRace
+from translator_pool import TranslatorPoolManager
+from web_translator import TRANSLATORS
+
+FORMATS = ('txt', 'jsonl', 'csv')
+
+
+def detect_format(path, fmt=None):
+    """根据参数或文件扩展名确定文件格式"""
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    if ext in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if ext in ('csv', 'tsv'):
+        return 'csv'
+    return 'txt'
+
+
+def parse_proxy(proxy_url):
+    """把 protocol://[username:password@]address:port 形式的代理地址转换为翻译器的代理配置"""
+    if not proxy_url:
+        return None
+    parts = urlsplit(proxy_url)
+    return {
+        "using": True,
+        "protocol": parts.scheme or 'http',
+        "address": parts.hostname,
+        "port": parts.port,
+        "username": parts.username or '',
+        "password": parts.password or '',
+    }
+
+
+def read_records(path, fmt, field='text', column='text'):
+    """逐条读取输入文件
+
+    jsonl 格式中无法解析或不是对象的行不会中止读取，该行作为 {'raw': 行内容} 记录返回，并附带错误信息。
+
+    Yields:
+        (原始记录, 待翻译文本, 错误信息)，txt 格式的记录为行内容本身，错误信息为 None 表示记录有效
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if fmt == 'txt':
+            for line in f:
+                line = line.rstrip('\r\n')
+                yield line, line, None
+        elif fmt == 'jsonl':
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield {'raw': line.rstrip('\r\n')}, '', f"不是有效的 JSON: {str(e)}"
+                    continue
+                if not isinstance(record, dict):
+                    yield {'raw': line.rstrip('\r\n')}, '', "记录不是 JSON 对象"
+                    continue
+                text = record.get(field) or ''
+                if not isinstance(text, str):
+                    yield record, '', f"字段 {field} 不是字符串"
+                    continue
+                yield record, text, None
+        else:
+            for record in csv.DictReader(f):
+                yield record, record.get(column) or '', None
+
+
+class RecordWriter:
+    """按输入顺序流式写出翻译结果
+
+    翻译任务乱序完成，结果先放入重排缓冲区，连续的前缀一旦就绪立即写出并刷新。
+    """
+
+    def __init__(self, path, fmt, output_field='translation'):
+        self.fmt = fmt
+        self.output_field = output_field
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._csv_writer = None
+        self._pending = {}
+        self._next_index = 0
+
+    def add(self, index, record, translation, error=None):
+        self._pending[index] = (record, translation, error)
+        while self._next_index in self._pending:
+            self._write(*self._pending.pop(self._next_index))
+            self._next_index += 1
+        self._file.flush()
+
+    def _write(self, record, translation, error):
+        if self.fmt == 'txt':
+            self._file.write((translation or '') + '\n')
+        elif self.fmt == 'jsonl':
+            record = dict(record, **{self.output_field: translation})
+            if error:
+                record['error'] = error
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            if self._csv_writer is None:
+                self._csv_writer = csv.DictWriter(self._file, fieldnames=list(record) + [self.output_field])
+                self._csv_writer.writeheader()
+            self._csv_writer.writerow(dict(record, **{self.output_field: translation or ''}))
+
+    def close(self):
+        self._file.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='PyTranslator 命令行批量翻译')
+    parser.add_argument('input', help='输入文件（txt/jsonl/csv）')
+    parser.add_argument('-o', '--output', required=True, help='输出文件，格式与输入相同')
+    parser.add_argument('-e', '--engine', default='baidu', choices=sorted(TRANSLATORS), help='翻译引擎')
+    parser.add_argument('--race', help='竞速模式：逗号分隔的多个引擎，采用最先返回的结果')
+    parser.add_argument('--hedge-delay', type=float, default=0.5, help='竞速模式下相邻引擎的启动间隔（秒）')
+    parser.add_argument('--deadline', type=float, help='每条记录的整体超时时间（秒），超时的记录记为失败')
+    parser.add_argument('-w', '--workers', type=int, default=2, help='并行的浏览器实例数量')
+    parser.add_argument('--multi-tab', action='store_true', help='所有翻译器共用一个浏览器进程，每个翻译器占用一个标签页')
+    parser.add_argument('--format', choices=FORMATS, help='输入文件格式，默认按扩展名判断')
+    parser.add_argument('--field', default='text', help='jsonl 格式中待翻译文本的字段名')
+    parser.add_argument('--column', default='text', help='csv 格式中待翻译文本的列名')
+    parser.add_argument('--output-field', default='translation', help='jsonl/csv 格式中译文的字段名')
+    parser.add_argument('--source-lang', default='auto', help='源语言，用于缓存键')
+    parser.add_argument('--target-lang', default='auto', help='目标语言，用于缓存键')
+    parser.add_argument('--driver-path', default='./browser_driver/msedgedriver.exe', help='浏览器驱动路径')
+    parser.add_argument('--proxy', help='代理地址，如 http://127.0.0.1:7890')
+    parser.add_argument('--cache', default='./cache/translation_cache.db', help='翻译缓存数据库路径')
+    parser.add_argument('--no-cache', action='store_true', help='不使用持久化翻译缓存')
+    parser.add_argument('--show-browser', action='store_true', help='显示浏览器窗口（默认无头模式）')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    fmt = detect_format(args.input, args.format)
+    driver_path = os.path.abspath(args.driver_path)
+    if not os.path.exists(driver_path):
+        print(f"浏览器驱动文件不存在: {driver_path}", file=sys.stderr)
+        return 1
+
+    cache = TranslationCache(None if args.no_cache else args.cache)
+    manager = TranslatorPoolManager(driver_path, args.workers, is_headless=not args.show_browser,
+                                    proxy_config=parse_proxy(args.proxy), multi_tab=args.multi_tab)
+    if args.race:
+        engines = [engine for engine in args.race.split(',') if engine]
+        unknown = [engine for engine in engines if engine not in TRANSLATORS]
+        if unknown or not engines:
+            print(f"未知的翻译引擎: {', '.join(unknown)}", file=sys.stderr)
+            return 1
+        pool = HedgedRace(manager, [TRANSLATORS[engine] for engine in engines], args.hedge_delay)
+    else:
+        pool = manager.get_pool(TRANSLATORS[args.engine])
+    writer = RecordWriter(args.output, fmt, args.output_field)
+
+    def translate_record(text):
+        if not text.strip():
+            return text
+        job = TranslationJob(args.deadline)
+
+        def translate_chunk(chunk):
+            job.check()
+            return cache.translate(pool, chunk, args.source_lang, args.target_lang, job=job)
+
+        result = translate_document(translate_chunk, text, pool.max_text_length, 1)
+        if not result:
+            # 有片段没有取得译文，整条记录按失败处理，不输出空白译文
+            raise RuntimeError("未获取到翻译结果")
+        return result
+
+    start = time.perf_counter()
+    total = failed = chars = 0
+    try:
+        pool.warm_up()
+        print(f"{args.workers} 个 {pool.engine_name} 翻译器已就绪，启动耗时 {time.perf_counter() - start:.1f} 秒",
+              file=sys.stderr)
+
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            in_flight = {}
+            records = enumerate(read_records(args.input, fmt, args.field, args.column))
+            exhausted = False
+            while in_flight or not exhausted:
+                # 控制同时提交的任务数量，避免大文件一次性读入内存
+                while not exhausted and len(in_flight) < args.workers * 4:
+                    try:
+                        index, (record, text, error) = next(records)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if error:
+                        # 无法读取的记录与翻译失败的记录一样计为失败，写出错误信息后继续处理后面的记录
+                        total += 1
+                        failed += 1
+                        print(f"第 {index + 1} 条读取失败: {error}", file=sys.stderr)
+                        writer.add(index, record, None, error)
+                        continue
+                    in_flight[executor.submit(translate_record, text)] = (index, record, text)
+
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, record, text = in_flight.pop(future)
+                    total += 1
+                    chars += len(text)
+                    try:
+                        writer.add(index, record, future.result())
+                    except Exception as e:
+                        failed += 1
+                        print(f"第 {index + 1} 条翻译失败: {str(e)}", file=sys.stderr)
+                        writer.add(index, record, None, str(e))
+
+                    if total % 100 == 0:
+                        elapsed = time.perf_counter() - start
+                        print(f"已完成 {total} 条，{total / elapsed:.2f} 条/秒", file=sys.stderr)
+
+        elapsed = time.perf_counter() - start
+        print(f"完成 {total} 条（失败 {failed} 条），共 {chars} 字符，耗时 {elapsed:.1f} 秒，"
+              f"{total / elapsed:.2f} 条/秒，{chars / elapsed:.0f} 字符/秒", file=sys.stderr)
+        print(f"缓存统计: {cache.stats()}", file=sys.stderr)
+        if args.race:
+            print(f"竞速统计: {pool.stats.snapshot()}", file=sys.stderr)
+    finally:
+        writer.close()
+        if args.race:
+            pool.close()
+        manager.close()
+        cache.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,676 @@
+"""离线性能基准测试
+
+在本地启动替身翻译页面，页面结构按各引擎的 input_csspath / output_csspath / clear_csspath 生成，
+翻译结果在可配置的延迟后写入输出元素。翻译器的 url 指向替身页面，因此测试不访问真实网站，
+结果可以在不同版本之间对比。免浏览器的 HTTP 引擎（如 ali-http）使用同一服务提供的替身接口，
+吞吐量测试期间令牌会失效一次，报告中记录获取令牌的次数。
+
+测量项目:
+    冷启动：浏览器启动耗时、首次翻译耗时（含页面加载）
+    单次翻译耗时的百分位
+    多个翻译器并发时的吞吐量
+    浏览器进程占用的内存（需要安装 psutil）
+    translate() 各阶段的耗时汇总
+    资源屏蔽节省的字节数和耗时（--resource-savings，需要访问真实网站）
+
+用法示例:
+    python benchmark.py --engines baidu,deepl --iterations 20 --concurrency 2 -o bench.json
+    python benchmark.py --engines baidu,deepl --resource-savings -o bench.json
+"""
+import argparse
+import email.parser
+import html
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+from memory_governor import process_tree_rss
+from translation_metrics import default_registry
+from translation_race import percentile
+from http_translator import AliHttpTranslator
+from translator_pool import TranslatorPool
+from web_translator import TRANSLATORS, WebTranslator
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SAMPLE_TEXTS = (
+    "Hello, world!",
+    "The quick brown fox jumps over the lazy dog.",
+    "Performance measurements are only useful when they can be repeated under the same conditions.",
+    "Python自动化测试",
+    "A translation benchmark should exercise short phrases as well as longer paragraphs, because the "
+    "time spent waiting for the result grows with the length of the text while the fixed overhead of "
+    "locating elements and clearing the input stays the same.",
+)
+
+_VOID_TAGS = {'img', 'input', 'br', 'hr'}
+# 选择器中的组合符与复合选择器（支持反斜杠转义）
+_SELECTOR_TOKEN_RE = re.compile(r'\s*(>)\s*|\s+|((?:\\.|[^\s>\\])+)')
+_COMPOUND_PART_RE = re.compile(r'([#.]|:nth-child\()?((?:\\.|[\w-])+)\)?')
+_UNESCAPE_RE = re.compile(r'\\(.)')
+
+_MOCK_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+[contenteditable] {{ display: block; min-height: 1em; min-width: 10em; }}
+textarea {{ width: 30em; height: 6em; }}
+</style>
+</head>
+<body>
+{body}
+<script>
+(() => {{
+    const config = {config};
+    const input = document.querySelector(config.input);
+    const output = document.querySelector(config.output);
+    const clear = document.querySelector(config.clear);
+    const read = () => (typeof input.value === 'string') ? input.value : input.innerText;
+    let timer = null;
+    const schedule = () => {{
+        clearTimeout(timer);
+        const text = read().trim();
+        if (!text) {{
+            output.textContent = '';
+            return;
+        }}
+        timer = setTimeout(() => {{
+            output.textContent = '[' + config.engine + '] ' + text;
+        }}, config.delay + config.perChar * text.length);
+    }};
+    input.addEventListener('input', schedule);
+    clear.addEventListener('click', () => {{
+        clearTimeout(timer);
+        if (typeof input.value === 'string') {{
+            input.value = '';
+        }} else {{
+            input.textContent = '';
+        }}
+        output.textContent = '';
+    }});
+}})();
+</script>
+</body>
+</html>
+"""
+
+
+def parse_selector(selector):
+    """解析由子代/后代组合符连接的 CSS 选择器
+
+    Returns:
+        [{'tag': ..., 'id': ..., 'classes': [...], 'nth': ...}, ...]，
+        后代组合符按子代处理（直接子元素同样满足后代关系）
+    """
+    compounds = []
+    for match in _SELECTOR_TOKEN_RE.finditer(selector.strip()):
+        if match.group(2):
+            compounds.append(_parse_compound(match.group(2)))
+    return compounds
+
+
+def _parse_compound(text):
+    compound = {'tag': None, 'id': None, 'classes': [], 'nth': None}
+    for prefix, name in _COMPOUND_PART_RE.findall(text):
+        name = _UNESCAPE_RE.sub(r'\1', name)
+        if not prefix:
+            compound['tag'] = name.lower()
+        elif prefix == '#':
+            compound['id'] = name
+        elif prefix == '.':
+            compound['classes'].append(name)
+        else:
+            compound['nth'] = int(name)
+    return compound
+
+
+class _MockNode:
+    def __init__(self, compound):
+        self.compound = compound
+        self.tag = compound['tag'] or 'div'
+        self.attrs = {}
+        # nth-child 指定位置的子元素，以及其余按添加顺序排列的子元素
+        self.pinned = {}
+        self.children = []
+
+    def child(self, compound):
+        key = (compound['tag'], compound['id'], tuple(compound['classes']), compound['nth'])
+        if compound['nth']:
+            node = self.pinned.get(compound['nth'])
+            if node is None:
+                node = self.pinned[compound['nth']] = _MockNode(compound)
+            elif _compound_key(node.compound) != key:
+                raise ValueError(f"选择器在第 {compound['nth']} 个子元素处冲突")
+            return node
+        for node in self.children:
+            if _compound_key(node.compound) == key:
+                return node
+        node = _MockNode(compound)
+        self.children.append(node)
+        return node
+
+    def ordered_children(self):
+        """按 nth-child 要求排列子元素，空缺位置用占位元素填充"""
+        ordered = []
+        last = max(self.pinned, default=0)
+        for position in range(1, last + 1):
+            ordered.append(self.pinned.get(position) or _MockNode({'tag': 'div', 'id': None, 'classes': [],
+                                                                    'nth': None}))
+        return ordered + self.children
+
+    def render(self, indent=0):
+        attrs = dict(self.attrs)
+        if self.compound['id']:
+            attrs['id'] = self.compound['id']
+        if self.compound['classes']:
+            attrs['class'] = ' '.join(self.compound['classes'])
+        attr_text = ''.join(f' {name}="{html.escape(value)}"' for name, value in attrs.items())
+        pad = '  ' * indent
+        if self.tag in _VOID_TAGS:
+            return f"{pad}<{self.tag}{attr_text}>"
+        inner = [child.render(indent + 1) for child in self.ordered_children()]
+        if not inner:
+            return f"{pad}<{self.tag}{attr_text}></{self.tag}>"
+        return f"{pad}<{self.tag}{attr_text}>\n" + '\n'.join(inner) + f"\n{pad}</{self.tag}>"
+
+
+def _compound_key(compound):
+    return compound['tag'], compound['id'], tuple(compound['classes']), compound['nth']
+
+
+def build_mock_page(engine, input_csspath, output_csspath, clear_csspath, delay=0.2, per_char_delay=0.0,
+                    textarea_input=True):
+    """生成与引擎页面选择器结构一致的替身翻译页面
+
+    Args:
+        engine: 引擎名称，会出现在译文前缀中
+        input_csspath: 输入框选择器
+        output_csspath: 输出元素选择器
+        clear_csspath: 清除按钮选择器
+        delay: 输入停止后多久写出译文（秒）
+        per_char_delay: 每个字符额外增加的翻译延迟（秒）
+        textarea_input: 选择器未指定标签时，输入框是否使用 textarea（否则使用 contenteditable 元素）
+
+    Returns:
+        页面 HTML
+    """
+    root = _MockNode({'tag': 'body', 'id': None, 'classes': [], 'nth': None})
+    leaves = {}
+    for role, selector in (('input', input_csspath), ('output', output_csspath), ('clear', clear_csspath)):
+        node = root
+        for compound in parse_selector(selector):
+            node = node.child(compound)
+        leaves[role] = node
+
+    input_node = leaves['input']
+    if input_node.compound['tag'] is None and textarea_input:
+        input_node.tag = 'textarea'
+    elif input_node.tag not in ('textarea', 'input'):
+        input_node.attrs['contenteditable'] = 'true'
+
+    config = {
+        'engine': engine,
+        'input': input_csspath,
+        'output': output_csspath,
+        'clear': clear_csspath,
+        'delay': delay * 1000,
+        'perChar': per_char_delay * 1000,
+    }
+    body = '\n'.join(child.render() for child in root.ordered_children())
+    # 防止选择器中的字符提前结束 script 标签
+    config_json = json.dumps(config, ensure_ascii=False).replace('</', '<\\/')
+    return _MOCK_PAGE_TEMPLATE.format(title=html.escape(engine), body=body, config=config_json)
+
+
+class MockAliApi:
+    """阿里翻译接口的替身
+
+    GET /api/translate/csrftoken 返回当前令牌，POST /api/translate/text 校验令牌后返回译文；
+    rotate_token() 之后旧令牌按令牌失效处理，用于测试 HttpTranslator 重新获取会话信息。
+    """
+
+    def __init__(self, engine='ali-http', delay=0.0, per_char_delay=0.0):
+        """
+        Args:
+            engine: 引擎名称，会出现在译文前缀中
+            delay: 每次翻译请求的处理延迟（秒）
+            per_char_delay: 每个字符额外增加的处理延迟（秒）
+        """
+        self.engine = engine
+        self.delay = delay
+        self.per_char_delay = per_char_delay
+        self.token = 'token-1'
+        self.requests = 0
+        self.rejected = 0
+        self.harvests = 0
+        self._lock = threading.Lock()
+
+    def mount(self, server):
+        """在替身服务上注册页面和接口，返回站点地址"""
+        server.register('', '<!DOCTYPE html><html><head><title>ali-http</title></head><body></body></html>')
+        server.register_api('GET', '/api/translate/csrftoken', self.csrf_token)
+        server.register_api('POST', '/api/translate/text', self.translate)
+        return server.base_url
+
+    def rotate_token(self):
+        """更换令牌，之前获取的令牌全部失效"""
+        with self._lock:
+            self.token = f"token-{int(self.token.rsplit('-', 1)[1]) + 1}"
+
+    def harvest(self, translator=None):
+        """免浏览器获取会话信息，可用作 HttpTranslator 的 harvester"""
+        with self._lock:
+            self.harvests += 1
+            return {'cookies': {}, 'user_agent': None,
+                    'tokens': {'csrf_token': self.token, 'csrf_param': '_csrf', 'csrf_header': 'X-XSRF-TOKEN'}}
+
+    def csrf_token(self, fields, headers):
+        with self._lock:
+            self.harvests += 1
+            return 200, {'token': self.token, 'parameterName': '_csrf', 'headerName': 'X-XSRF-TOKEN'}
+
+    def translate(self, fields, headers):
+        text = fields.get('query') or ''
+        time.sleep(self.delay + self.per_char_delay * len(text))
+        with self._lock:
+            self.requests += 1
+            if headers.get('X-XSRF-TOKEN') != self.token or fields.get('_csrf') != self.token:
+                self.rejected += 1
+                return 200, {'success': False, 'code': 'CSRF_TOKEN_INVALID'}
+        return 200, {'success': True, 'data': {'translateText': f"[{self.engine}] {text}"}}
+
+
+# 有替身接口的 HTTP 引擎
+MOCK_APIS = {AliHttpTranslator: MockAliApi}
+
+
+class MockTranslationServer(ThreadingHTTPServer):
+    """提供替身翻译页面和替身翻译接口的本地 HTTP 服务"""
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0)):
+        super().__init__(address, _MockPageHandler)
+        self.pages = {}
+        self.apis = {}
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def register(self, name, page):
+        """注册页面，返回页面地址"""
+        self.pages['/' + name] = page.encode('utf-8')
+        return f"{self.base_url}/{name}"
+
+    def register_api(self, method, path, handler):
+        """注册接口
+
+        Args:
+            method: 'GET' 或 'POST'
+            path: 接口路径
+            handler: 接收 (表单字段, 请求头)，返回 (状态码, 响应 JSON)
+        """
+        self.apis[(method, path)] = handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _MockPageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # 响应头和响应体分两次写出，关闭 Nagle 算法以免保持连接时每个响应多等一个延迟确认
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._call_api('POST', self._parse_fields(data))
+
+    def _parse_fields(self, data):
+        """解析 urlencoded 或 multipart/form-data 表单"""
+        content_type = self.headers.get('Content-Type', '')
+        if not content_type.startswith('multipart/'):
+            return dict(parse_qsl(data.decode('utf-8')))
+        message = email.parser.BytesParser().parsebytes(
+            b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + data)
+        return {part.get_param('name', header='content-disposition'): part.get_payload(decode=True).decode('utf-8')
+                for part in message.get_payload()}
+
+    def _call_api(self, method, fields):
+        handler = self.server.apis.get((method, self.path.split('?', 1)[0]))
+        if handler is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        status, payload = handler(fields, self.headers)
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if ('GET', self.path.split('?', 1)[0]) in self.server.apis:
+            self._call_api('GET', dict(parse_qsl(self.path.partition('?')[2])))
+            return
+        page = self.server.pages.get(self.path.split('?', 1)[0])
+        if page is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(page)))
+        self.end_headers()
+        self.wfile.write(page)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def browser_memory(translator):
+    """浏览器驱动及其子进程（浏览器主进程、渲染进程等）的常驻内存（字节），无 psutil 时返回 None"""
+    if translator.driver is None:
+        return None
+    return process_tree_rss(translator.browser_pid())
+
+
+def summarize(latencies):
+    """耗时列表（秒）的统计信息"""
+    if not latencies:
+        return {'count': 0}
+    return {
+        'count': len(latencies),
+        'mean': sum(latencies) / len(latencies),
+        'min': min(latencies),
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+        'max': max(latencies),
+    }
+
+
+def benchmark_engine(name, translator_class, server, driver_path, iterations=20, concurrency=2, delay=0.2,
+                     per_char_delay=0.0, is_headless=True, texts=SAMPLE_TEXTS):
+    """对单个引擎执行基准测试
+
+    Returns:
+        {'cold_start': ..., 'latency': ..., 'throughput': ..., 'memory': ...}
+    """
+    result = {}
+    start = time.perf_counter()
+    translator = translator_class(driver_path, is_headless=is_headless)
+    browser_start = time.perf_counter() - start
+    mock_url = server.register(name, build_mock_page(
+        name, translator.input_csspath, translator.output_csspath, translator.clear_csspath, delay,
+        per_char_delay, 'native_value' in (translator.inject_strategies or ())))
+
+    def create_translator():
+        instance = translator_class(driver_path, is_headless=is_headless)
+        instance.url = mock_url
+        return instance
+
+    try:
+        translator.url = mock_url
+        start = time.perf_counter()
+        translator.translate(texts[0])
+        result['cold_start'] = {
+            'browser_start': browser_start,
+            'first_translation': time.perf_counter() - start,
+            'total': browser_start + time.perf_counter() - start,
+        }
+
+        latencies = []
+        errors = 0
+        for i in range(iterations):
+            start = time.perf_counter()
+            try:
+                translator.translate(texts[i % len(texts)])
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+        result['latency'] = dict(summarize(latencies), errors=errors)
+        result['memory'] = {'browser_rss': browser_memory(translator)}
+    finally:
+        translator.quit()
+
+    pool = TranslatorPool(create_translator, concurrency, name, translator_class.max_text_length)
+    try:
+        pool.warm_up()
+        jobs = [texts[i % len(texts)] for i in range(iterations * concurrency)]
+        errors = 0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(pool.translate, text) for text in jobs]
+            for future in futures:
+                if future.exception() or not future.result():
+                    errors += 1
+        elapsed = time.perf_counter() - start
+        result['throughput'] = {
+            'concurrency': concurrency,
+            'translations': len(jobs),
+            'errors': errors,
+            'elapsed': elapsed,
+            'per_second': len(jobs) / elapsed,
+        }
+    finally:
+        pool.close()
+
+    if psutil is not None:
+        result['memory']['process_rss'] = psutil.Process().memory_info().rss
+    # 各阶段的耗时汇总，便于定位变慢的阶段
+    result['phases'] = [series for series in default_registry.snapshot()
+                        if series['engine'] == translator_class.__name__]
+    return result
+
+
+def measure_resource_savings(translator_class, driver_path, is_headless=True, text=SAMPLE_TEXTS[0]):
+    """在引擎的真实页面上测量资源屏蔽节省的字节数和耗时
+
+    替身页面不加载图片、字体等外部资源，因此这一项只能访问真实网站。
+    测量后在屏蔽资源的页面上翻译一次，确认 resource_allowlist 放行的资源足以让页面正常工作；
+    确认无误的引擎才应把 block_resources_by_default 设为 True。
+
+    Args:
+        translator_class: 网页翻译器类
+        driver_path: 浏览器驱动路径
+        is_headless: 是否无头模式
+        text: 用于确认页面可用的文本
+
+    Returns:
+        {'bytes_saved': ..., 'ms_saved': ..., 'baseline': ..., 'blocked': ...,
+         'resource_allowlist': [...], 'blocked_by_default': ..., 'translation_ok': ...}
+    """
+    translator = translator_class(driver_path, is_headless=is_headless, block_resources=True)
+    try:
+        result = translator.measure_resource_savings()
+        result['resource_allowlist'] = list(translator_class.resource_allowlist)
+        result['blocked_by_default'] = translator_class.block_resources_by_default
+        try:
+            result['translation_ok'] = bool(translator.translate(text))
+        except Exception as e:
+            result['translation_ok'] = False
+            result['translation_error'] = str(e)
+        return result
+    finally:
+        translator.quit()
+
+
+def benchmark_http_engine(name, translator_class, server, iterations=20, concurrency=2, delay=0.2,
+                          per_char_delay=0.0, texts=SAMPLE_TEXTS):
+    """对免浏览器的 HTTP 引擎执行基准测试
+
+    翻译器指向替身接口，会话信息由替身接口直接提供，不启动浏览器。吞吐量测试开始前令牌失效一次，
+    同一引擎的翻译器共用会话信息，因此整个测试只应获取两次令牌。
+
+    Returns:
+        {'cold_start': ..., 'latency': ..., 'throughput': ..., 'session': ...}
+    """
+    api = MOCK_APIS[translator_class](name, delay, per_char_delay)
+    base_url = api.mount(server)
+
+    def create_translator():
+        return translator_class(base_url=base_url, harvester=api.harvest, pool_maxsize=concurrency)
+
+    result = {}
+    translator = create_translator()
+    try:
+        start = time.perf_counter()
+        translator.translate(texts[0])
+        result['cold_start'] = {'first_translation': time.perf_counter() - start}
+
+        latencies = []
+        errors = 0
+        for i in range(iterations):
+            start = time.perf_counter()
+            try:
+                translator.translate(texts[i % len(texts)])
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+        result['latency'] = dict(summarize(latencies), errors=errors)
+
+        api.rotate_token()
+        pool = TranslatorPool(create_translator, concurrency, name, translator_class.max_text_length)
+        try:
+            pool.warm_up()
+            jobs = [texts[i % len(texts)] for i in range(iterations * concurrency)]
+            errors = 0
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [executor.submit(pool.translate, text) for text in jobs]
+                for future in futures:
+                    if future.exception() or not future.result():
+                        errors += 1
+            elapsed = time.perf_counter() - start
+            result['throughput'] = {
+                'concurrency': concurrency,
+                'translations': len(jobs),
+                'errors': errors,
+                'elapsed': elapsed,
+                'per_second': len(jobs) / elapsed,
+            }
+        finally:
+            pool.close()
+    finally:
+        translator.quit()
+
+    result['session'] = {'harvests': api.harvests, 'requests': api.requests, 'rejected': api.rejected}
+    return result
+
+
+def git_revision():
+    """当前代码的 git 版本，用于区分不同版本的测试结果"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def benchmark_engines():
+    """可以离线测试的引擎：所有网页引擎，以及有替身接口的 HTTP 引擎"""
+    return sorted(name for name, cls in TRANSLATORS.items() if issubclass(cls, WebTranslator) or cls in MOCK_APIS)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='PyTranslator 离线性能基准测试')
+    parser.add_argument('--engines', default=','.join(benchmark_engines()),
+                        help='逗号分隔的引擎列表，默认全部可测试的引擎')
+    parser.add_argument('--iterations', type=int, default=20, help='每个引擎的顺序翻译次数')
+    parser.add_argument('--concurrency', type=int, default=2, help='吞吐量测试的翻译器数量')
+    parser.add_argument('--delay', type=float, default=0.2, help='替身页面的翻译延迟（秒）')
+    parser.add_argument('--per-char-delay', type=float, default=0.0, help='每个字符额外的翻译延迟（秒）')
+    parser.add_argument('--driver-path', default='./browser_driver/msedgedriver.exe', help='浏览器驱动路径')
+    parser.add_argument('--resource-savings', action='store_true',
+                        help='在真实页面上测量资源屏蔽的节省量（需要联网）')
+    parser.add_argument('--show-browser', action='store_true', help='显示浏览器窗口（默认无头模式）')
+    parser.add_argument('-o', '--output', help='结果 JSON 文件，默认输出到标准输出')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    engines = [engine for engine in args.engines.split(',') if engine]
+    unknown = [engine for engine in engines if engine not in benchmark_engines()]
+    if unknown or not engines:
+        print(f"未知或无法离线测试的翻译引擎: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+    web_engines = [engine for engine in engines if issubclass(TRANSLATORS[engine], WebTranslator)]
+    driver_path = os.path.abspath(args.driver_path)
+    if web_engines and not os.path.exists(driver_path):
+        print(f"浏览器驱动文件不存在: {driver_path}", file=sys.stderr)
+        return 1
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {
+            'iterations': args.iterations,
+            'concurrency': args.concurrency,
+            'delay': args.delay,
+            'per_char_delay': args.per_char_delay,
+            'headless': not args.show_browser,
+            'resource_savings': args.resource_savings,
+        },
+        'engines': {},
+    }
+    server = MockTranslationServer().start()
+    try:
+        for engine in engines:
+            print(f"测试 {engine} ...", file=sys.stderr)
+            try:
+                if engine in web_engines:
+                    report['engines'][engine] = benchmark_engine(
+                        engine, TRANSLATORS[engine], server, driver_path, args.iterations, args.concurrency,
+                        args.delay, args.per_char_delay, not args.show_browser)
+                else:
+                    report['engines'][engine] = benchmark_http_engine(
+                        engine, TRANSLATORS[engine], server, args.iterations, args.concurrency, args.delay,
+                        args.per_char_delay)
+            except Exception as e:
+                print(f"{engine} 测试失败: {str(e)}", file=sys.stderr)
+                report['engines'][engine] = {'error': str(e)}
+            if args.resource_savings and engine in web_engines:
+                print(f"测量 {engine} 资源屏蔽节省量 ...", file=sys.stderr)
+                try:
+                    report['engines'][engine]['resource_savings'] = measure_resource_savings(
+                        TRANSLATORS[engine], driver_path, not args.show_browser)
+                except Exception as e:
+                    print(f"{engine} 资源屏蔽测量失败: {str(e)}", file=sys.stderr)
+                    report['engines'][engine]['resource_savings'] = {'error': str(e)}
+    finally:
+        server.stop()
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""多标签页模式：一个浏览器进程承载多个翻译器
+
+每个翻译器占用共享浏览器中的一个标签页，增加翻译器只需打开一个标签页，无需再启动一个浏览器进程。
+浏览器驱动的会话同一时间只能执行一条命令，且命令总是作用于当前窗口，因此各标签页的命令通过主机锁串行执行，
+执行前切换到该标签页；等待翻译结果等不占用浏览器的时间各标签页互不阻塞。
+"""
+import copy
+import functools
+import threading
+from typing import Dict, Any
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.edge.service import Service
+from selenium.webdriver.remote.command import Command
+
+# 浏览器驱动默认的页面加载超时（秒）
+DEFAULT_PAGE_LOAD_TIMEOUT = 300
+
+
+def build_edge_options(is_headless=True, proxy_config: Dict[str, Any] = None, performance_log=False,
+                       background_tabs=False):
+    """创建 Edge 浏览器的启动参数
+
+    Args:
+        is_headless: 是否使用无头模式
+        proxy_config: 代理配置
+        performance_log: 是否开启性能日志，用于接收 CDP Network 事件
+        background_tabs: 是否关闭后台标签页的节流，多标签页模式下后台标签页也需要全速运行
+    """
+    options = webdriver.EdgeOptions()
+    if is_headless:
+        options.add_argument('--headless')  # 不显示浏览器
+    options.add_argument("--disable-gpu")  # 禁用GPU加速
+    options.add_argument("--disable-dev-shm-usage")  # 禁用共享内存
+    if background_tabs:
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-renderer-backgrounding")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+    if performance_log:
+        options.set_capability('ms:loggingPrefs', {'performance': 'ALL'})
+
+    # 配置代理
+    if proxy_config and proxy_config.get('using'):
+        proxy_str = f"{proxy_config['protocol']}://{proxy_config['address']}:{proxy_config['port']}"
+        options.add_argument(f"--proxy-server={proxy_str}")
+        if proxy_config.get('username') and proxy_config.get('password'):
+            options.add_argument(f"--proxy-auth={proxy_config['username']}:{proxy_config['password']}")
+    return options
+
+
+def load_url(driver, url, page_load_timeout=None):
+    """打开页面，driver.get 最多阻塞 page_load_timeout 秒，之后恢复默认的页面加载超时
+
+    Args:
+        driver: WebDriver 或标签页对象
+        url: 页面地址
+        page_load_timeout: 页面加载超时（秒），None 表示使用浏览器驱动的默认值
+    """
+    if page_load_timeout is not None:
+        driver.set_page_load_timeout(max(1, page_load_timeout))
+    try:
+        driver.get(url)
+    finally:
+        if page_load_timeout is not None:
+            driver.set_page_load_timeout(DEFAULT_PAGE_LOAD_TIMEOUT)
+
+
+class BrowserHost:
+    """共享的浏览器进程，为每个翻译器提供一个标签页
+
+    open_tab() 返回的标签页对象与 WebDriver 用法相同，其每条命令都会在主机锁内先切换到该标签页再执行。
+    浏览器首次打开标签页时才启动，失去响应时在下一次打开标签页时重启。
+    """
+
+    def __init__(self, driver_path, is_headless=True, proxy_config: Dict[str, Any] = None):
+        """
+        Args:
+            driver_path: 浏览器驱动路径
+            is_headless: 是否使用无头模式
+            proxy_config: 代理配置
+        """
+        self.driver_path = driver_path
+        self.options = build_edge_options(is_headless, proxy_config, background_tabs=True)
+        self.driver = None
+        # 标签页对象 -> (所属的浏览器, 窗口句柄)
+        self._tabs = {}
+        # 当前窗口句柄，以及关闭最后一个标签页后留作复用的空白窗口
+        self._current = None
+        self._spare_handle = None
+        self._lock = threading.RLock()
+
+    @property
+    def tab_count(self):
+        return len(self._tabs)
+
+    def open_tab(self):
+        """打开一个新标签页，返回只操作该标签页的 WebDriver 对象"""
+        with self._lock:
+            driver = self._ensure_browser()
+            if self._spare_handle:
+                handle, self._spare_handle = self._spare_handle, None
+            else:
+                handle = type(driver).execute(driver, Command.NEW_WINDOW, {'type': 'tab'})['value']['handle']
+            tab = copy.copy(driver)
+            tab.execute = functools.partial(self._execute, driver, tab, handle)
+            self._tabs[tab] = (driver, handle)
+            return tab
+
+    def close_tab(self, tab):
+        """关闭标签页；最后一个标签页只清空不关闭，关闭它会结束整个浏览器会话"""
+        with self._lock:
+            driver, handle = self._tabs.pop(tab, (None, None))
+            if driver is None or driver is not self.driver:
+                return
+            try:
+                self._switch(driver, handle)
+                if self._tabs:
+                    type(driver).execute(driver, Command.CLOSE)
+                    self._current = None
+                else:
+                    type(driver).execute(driver, Command.GET, {'url': 'about:blank'})
+                    self._spare_handle = handle
+            except Exception as e:
+                print(f"关闭标签页失败: {str(e)}")
+
+    def load(self, tab, url, page_load_timeout=None):
+        """在标签页中打开页面
+
+        页面加载超时是整个浏览器会话的设置，设置超时、打开页面和恢复默认值在主机锁内一起执行，
+        以免一个标签页按截止时间缩短的超时作用到其他标签页的页面加载上。
+        """
+        with self._lock:
+            load_url(tab, url, page_load_timeout)
+
+    def ping(self, tab):
+        """检查标签页是否仍在响应
+
+        其他标签页的命令正在执行时视为正常：浏览器正在处理命令，此时排队等待会被心跳误判为卡死。
+        """
+        if not self._lock.acquire(blocking=False):
+            return True
+        try:
+            return tab.execute_script("return 1;") == 1
+        finally:
+            self._lock.release()
+
+    def quit(self):
+        """关闭浏览器及其中所有标签页"""
+        with self._lock:
+            self._tabs.clear()
+            self._quit_driver()
+
+    def _execute(self, driver, tab, handle, command, params=None):
+        with self._lock:
+            if driver is not self.driver:
+                raise WebDriverException("共享浏览器已关闭或重启，该标签页已失效")
+            self._switch(driver, handle)
+            return type(tab).execute(tab, command, params)
+
+    def _switch(self, driver, handle):
+        if self._current != handle:
+            type(driver).execute(driver, Command.SWITCH_TO_WINDOW, {'handle': handle})
+            self._current = handle
+
+    def _ensure_browser(self):
+        """返回可用的浏览器，尚未启动或已失去响应时（重新）启动"""
+        if self.driver is not None:
+            try:
+                type(self.driver).execute(self.driver, Command.W3C_GET_WINDOW_HANDLES)
+                return self.driver
+            except Exception as e:
+                print(f"共享浏览器已失去响应，正在重启: {str(e)}")
+                self._tabs.clear()
+                self._quit_driver()
+
+        self.driver = webdriver.Edge(service=Service(self.driver_path), options=self.options)
+        self._current = self._spare_handle = self.driver.current_window_handle
+        print("共享浏览器初始化成功")
+        return self.driver
+
+    def _quit_driver(self):
+        driver, self.driver = self.driver, None
+        self._current = self._spare_handle = None
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"关闭共享浏览器失败: {str(e)}")
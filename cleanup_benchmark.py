@@ -0,0 +1,147 @@
+"""文本清理性能对比
+
+对比 text_cleanup 与界面原先逐步 re.sub 的实现（保留在本文件中作为基准），
+先用随机文本校验两者输出完全一致，再测量大文本上的耗时。
+
+用法示例:
+    python cleanup_benchmark.py --size 4000000 --repeat 3 -o cleanup.json
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+
+import text_cleanup
+
+
+def legacy_clear_newline(source_text):
+    processed_text = re.sub(r'(\r\n)+', r'\r\n', source_text)
+    processed_text = re.sub(r'([^\r])\n+', r'\1\n', processed_text)
+    processed_text = re.sub(r'\r+', r'\r', processed_text)
+    return processed_text
+
+
+def legacy_clear_newline_all(source_text):
+    return re.sub(r'[\r\n]+', '', source_text)
+
+
+def legacy_clear_blank(source_text):
+    processed_text = re.sub(
+        r'([\u4e00-\u9fa5\u3000-\u303f\uff00-\uffef])([\t \u3000]+)([\u4e00-\u9fa5\u3000-\u303f\uff00-\uffef])', r'\1\3',
+        source_text)
+    processed_text = re.sub(r'[\t \u3000]+', r' ', processed_text)
+    processed_text = re.sub(r'([a-zA-Z]*)[\t \u3000]*-[\t \u3000]*([a-zA-Z]*)', r'\1-\2', processed_text)
+    processed_text = re.sub(r'(\b[a-zA-Z0-9]+\b)[\t \u3000]+(\b[a-zA-Z0-9]+\b)', r'\1 \2', processed_text)
+    processed_text = re.sub(r'([\u4e00-\u9fa5])([\t \u3000]*)([a-zA-Z])', r'\1\3', processed_text)
+    processed_text = re.sub(r'([a-zA-Z])([\t \u3000]*)([\u4e00-\u9fa5])', r'\1\3', processed_text)
+    return processed_text.strip()
+
+
+def legacy_clear_blank_all(source_text):
+    return re.sub(r'[\t \u3000]+', r'', source_text)
+
+
+LEGACY = {
+    'newline': legacy_clear_newline,
+    'newline_all': legacy_clear_newline_all,
+    'blank': legacy_clear_blank,
+    'blank_all': legacy_clear_blank_all,
+}
+OPTIMIZED = {
+    'newline': text_cleanup.clear_newline,
+    'newline_all': text_cleanup.clear_newline_all,
+    'blank': text_cleanup.clear_blank,
+    'blank_all': text_cleanup.clear_blank_all,
+}
+
+# 随机文本的字符表：中文、全角标点、英文、数字、连字符、各种空白和换行
+_ALPHABET = list('中文翻译，。、「」（）：ab Zx9-') + ['\t', ' ', ' ', '\u3000', '\n', '\r', '\r\n', '\xa0', 'word ']
+
+
+def random_text(rng, length):
+    return ''.join(rng.choice(_ALPHABET) for _ in range(length))
+
+
+def sample_document(size, seed=0):
+    """生成约 size 字符、中英文混排并带有多余空白和换行的文档"""
+    rng = random.Random(seed)
+    lines = (
+        "The quick  brown fox -  jumps over the\tlazy dog.",
+        "中文 段落 里 有 多余 的 空格，以及 English 单词 混排。",
+        "  full-width　spaces　　and  tabs\t\there  ",
+        "",
+        "\r\n",
+    )
+    parts = []
+    total = 0
+    while total < size:
+        line = rng.choice(lines)
+        parts.append(line + '\n' * rng.randint(1, 3))
+        total += len(parts[-1])
+    return ''.join(parts)
+
+
+def verify(cases=20000, seed=0, chunk_size=7):
+    """用随机文本校验新旧实现（包括小块流式处理）输出一致，返回不一致的 (模式, 原文) 列表"""
+    rng = random.Random(seed)
+    mismatches = []
+    for _ in range(cases):
+        text = random_text(rng, rng.randint(0, 40))
+        for mode, legacy in LEGACY.items():
+            expected = legacy(text)
+            if OPTIMIZED[mode](text) != expected or text_cleanup.cleanup(text, mode, chunk_size) != expected:
+                mismatches.append((mode, text))
+    return mismatches
+
+
+def timed(func, text, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='文本清理新旧实现的性能对比')
+    parser.add_argument('--size', type=int, default=2000000, help='测试文档的字符数')
+    parser.add_argument('--repeat', type=int, default=3, help='每项测量的重复次数，取最快一次')
+    parser.add_argument('--cases', type=int, default=20000, help='一致性校验的随机文本数量')
+    parser.add_argument('-o', '--output', help='结果 JSON 文件，默认输出到标准输出')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    mismatches = verify(args.cases)
+    for mode, text in mismatches[:10]:
+        print(f"输出不一致（{mode}）: {text!r}", file=sys.stderr)
+
+    document = sample_document(args.size)
+    report = {'size': len(document), 'mismatches': len(mismatches), 'modes': {}}
+    for mode in LEGACY:
+        legacy = timed(LEGACY[mode], document, args.repeat)
+        optimized = timed(OPTIMIZED[mode], document, args.repeat)
+        streamed = timed(lambda text: text_cleanup.cleanup(text, mode), document, args.repeat)
+        report['modes'][mode] = {
+            'legacy': legacy,
+            'optimized': optimized,
+            'streamed': streamed,
+            'speedup': legacy / optimized if optimized else None,
+        }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
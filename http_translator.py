@@ -0,0 +1,288 @@
+import json
+import threading
+import time
+from typing import Dict, Any
+
+import urllib3
+
+from translation_job import TranslationJob
+
+
+class TokenExpired(Exception):
+    """翻译接口的 cookies 或令牌已失效"""
+
+
+class _SharedSession:
+    """同一引擎、站点和代理的翻译器实例共用的会话信息和连接池"""
+
+    def __init__(self, http):
+        self.http = http
+        self.session = None
+        self.session_time = 0.0
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class HttpTranslator:
+    """免浏览器的翻译后端
+
+    只在首次使用（以及令牌失效）时启动一次浏览器获取 cookies 和令牌，
+    之后通过保持连接的 HTTP 连接池直接调用翻译接口。
+    同一引擎、站点和代理的实例共用会话信息和连接池，池中多个翻译器只需获取一次令牌。
+    接口与 WebTranslator 一致（translate/quit），可以放入 TranslatorPool 使用。
+    """
+
+    # 翻译站点地址
+    default_base_url = ''
+    # 用浏览器打开以获取 cookies 的页面路径
+    page_path = '/'
+    # 在页面中执行的异步脚本，通过 arguments[arguments.length - 1] 回调返回令牌字典
+    harvest_script = "arguments[arguments.length - 1]({});"
+    # 单次翻译允许的最大文本长度
+    max_text_length = 5000
+    # 翻译接口路径，默认的 build_request 使用
+    api_path = '/translate'
+
+    # (引擎类, 站点地址, 代理配置) -> _SharedSession
+    _shared_sessions = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, driver_path='./browser_driver/msedgedriver.exe', is_headless=True,
+                 proxy_config: Dict[str, Any] = None, base_url=None, harvester=None, source_lang='auto',
+                 target_lang='zh', pool_maxsize=4, http_timeout=10, token_ttl=1800):
+        """
+        Args:
+            driver_path: 浏览器驱动路径，获取令牌时使用
+            is_headless: 获取令牌时是否使用无头模式
+            proxy_config: 代理配置
+            base_url: 翻译接口的站点地址，可指向本地替身服务用于测试
+            harvester: 获取会话信息的可调用对象，接收翻译器实例，返回
+                {'cookies': {...}, 'tokens': {...}, 'user_agent': ...}；默认使用浏览器获取
+            source_lang: 源语言
+            target_lang: 目标语言
+            pool_maxsize: 连接池中保持的连接数，由共用该连接池的第一个实例决定
+            http_timeout: 单次 HTTP 请求的超时时间（秒）
+            token_ttl: 会话信息的最长使用时间（秒），超时后主动刷新
+        """
+        self.driver_path = driver_path
+        self.is_headless = is_headless
+        self.proxy_config = proxy_config
+        self.base_url = (base_url or self.default_base_url).rstrip('/')
+        self.harvester = harvester or self.browser_harvest
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.http_timeout = http_timeout
+        self.token_ttl = token_ttl
+        self._shared = self._acquire_shared(pool_maxsize)
+        self.http = self._shared.http
+
+    def _acquire_shared(self, pool_maxsize):
+        proxy_key = json.dumps(self.proxy_config, sort_keys=True) if self.proxy_config else None
+        key = (type(self), self.base_url, proxy_key)
+        with HttpTranslator._shared_lock:
+            shared = HttpTranslator._shared_sessions.get(key)
+            if shared is None:
+                shared = HttpTranslator._shared_sessions[key] = _SharedSession(self._create_pool_manager(pool_maxsize))
+            shared.users += 1
+            return shared
+
+    @property
+    def session(self):
+        return self._shared.session if self._shared else None
+
+    def _create_pool_manager(self, pool_maxsize):
+        retries = urllib3.Retry(total=1, connect=1, read=0, redirect=2)
+        if not (self.proxy_config and self.proxy_config.get('using')):
+            return urllib3.PoolManager(maxsize=pool_maxsize, retries=retries)
+
+        proxy = self.proxy_config
+        proxy_url = f"{proxy['protocol']}://{proxy['address']}:{proxy['port']}"
+        if proxy['protocol'].startswith('socks'):
+            from urllib3.contrib.socks import SOCKSProxyManager
+            return SOCKSProxyManager(proxy_url, username=proxy.get('username') or None,
+                                     password=proxy.get('password') or None, maxsize=pool_maxsize, retries=retries)
+
+        headers = None
+        if proxy.get('username') and proxy.get('password'):
+            headers = urllib3.make_headers(proxy_basic_auth=f"{proxy['username']}:{proxy['password']}")
+        return urllib3.ProxyManager(proxy_url, proxy_headers=headers, maxsize=pool_maxsize, retries=retries)
+
+    def browser_harvest(self, translator=None, web_timeout=15):
+        """启动一次浏览器，打开翻译页面获取 cookies 和令牌，完成后立即关闭浏览器"""
+        # 延迟导入，只有真正需要浏览器时才加载 selenium
+        from web_translator import WebTranslator
+
+        browser = WebTranslator(self.base_url + self.page_path, 'body', 'body', 'body',
+                                driver_path=self.driver_path, is_headless=self.is_headless,
+                                proxy_config=self.proxy_config, session_mode=False)
+        try:
+            browser._load_page(web_timeout)
+            browser.driver.set_script_timeout(web_timeout)
+            tokens = browser.driver.execute_async_script(self.harvest_script) or {}
+            cookies = {cookie['name']: cookie['value'] for cookie in browser.driver.get_cookies()}
+            user_agent = browser.driver.execute_script("return navigator.userAgent;")
+        finally:
+            browser.quit()
+        return {'cookies': cookies, 'tokens': tokens, 'user_agent': user_agent}
+
+    def refresh_session(self, stale=None):
+        """重新获取 cookies 和令牌
+
+        Args:
+            stale: 调用方发现已失效的会话信息；等待锁期间其他实例已刷新时直接返回新的会话信息，不再重复获取
+
+        Returns:
+            当前的会话信息
+        """
+        shared = self._shared
+        with shared.lock:
+            if shared.session is not None and shared.session is not stale:
+                return shared.session
+            shared.session = self.harvester(self)
+            shared.session_time = time.monotonic()
+            print(f"{type(self).__name__} 会话已刷新")
+            return shared.session
+
+    def _current_session(self):
+        shared = self._shared
+        session = shared.session
+        if session is None or time.monotonic() - shared.session_time > self.token_ttl:
+            return self.refresh_session(session)
+        return session
+
+    def translate(self, text, web_timeout=None, job=None):
+        """执行翻译，令牌失效时刷新一次后重试
+
+        Args:
+            text: 要翻译的文本
+            web_timeout: 单次 HTTP 请求的超时时间（秒），默认为 http_timeout
+            job: TranslationJob 实例，请求前检查任务状态，请求超时不超过任务的剩余时间
+
+        Returns:
+            翻译结果字符串或None
+        """
+        job = job or TranslationJob()
+        job.check('session')
+        session = self._current_session()
+        try:
+            job.check('request')
+            return self._request(session, text, job.remaining(web_timeout or self.http_timeout))
+        except TokenExpired:
+            job.check('request')
+            return self._request(self.refresh_session(session), text,
+                                 job.remaining(web_timeout or self.http_timeout))
+
+    def _request(self, session, text, timeout):
+        method, path, fields, headers = self.build_request(session, text)
+        headers = dict(headers)
+        headers.setdefault('User-Agent', session.get('user_agent') or 'Mozilla/5.0')
+        headers.setdefault('Referer', self.base_url + self.page_path)
+        if session.get('cookies'):
+            headers['Cookie'] = '; '.join(f"{name}={value}" for name, value in session['cookies'].items())
+
+        response = self.http.request(method, self.base_url + path, fields=fields, headers=headers,
+                                     timeout=timeout)
+        if response.status in (401, 403, 419):
+            raise TokenExpired(f"HTTP {response.status}")
+        if response.status >= 400:
+            raise RuntimeError(f"翻译接口返回错误: HTTP {response.status}")
+        return self.parse_response(response.data.decode('utf-8'))
+
+    def build_request(self, session, text):
+        """构造翻译请求，具体引擎按其接口覆盖
+
+        默认以表单向 api_path 提交 text、source_lang、target_lang 和会话中的全部令牌。
+
+        Returns:
+            (method, path, fields, headers)
+        """
+        fields = dict(session.get('tokens') or {}, text=text, source_lang=self.source_lang,
+                      target_lang=self.target_lang)
+        return 'POST', self.api_path, fields, {}
+
+    def parse_response(self, body):
+        """解析翻译接口的响应，具体引擎按其接口覆盖，令牌失效时抛出 TokenExpired
+
+        Returns:
+            翻译结果字符串，响应中没有结果时返回 None
+        """
+        return None
+
+    def quit(self):
+        """释放共用的会话信息，最后一个实例退出时关闭连接池"""
+        with HttpTranslator._shared_lock:
+            if self._shared is None:
+                return
+            self._shared.users -= 1
+            if self._shared.users <= 0:
+                for key, shared in list(HttpTranslator._shared_sessions.items()):
+                    if shared is self._shared:
+                        del HttpTranslator._shared_sessions[key]
+                self.http.clear()
+            self._shared = None
+
+
+class AliHttpTranslator(HttpTranslator):
+    """阿里翻译的免浏览器后端"""
+
+    default_base_url = 'https://translate.alibaba.com'
+    page_path = '/'
+    harvest_script = """
+        const done = arguments[arguments.length - 1];
+        fetch('/api/translate/csrftoken', {credentials: 'include'})
+            .then(response => response.json())
+            .then(data => done({csrf_token: data.token, csrf_param: data.parameterName, csrf_header: data.headerName}))
+            .catch(() => done({}));
+    """
+
+    def build_request(self, session, text):
+        tokens = session.get('tokens') or {}
+        fields = {
+            'srcLang': self.source_lang,
+            'tgtLang': self.target_lang,
+            'domain': 'general',
+            'query': text,
+        }
+        headers = {}
+        if tokens.get('csrf_token'):
+            fields[tokens.get('csrf_param') or '_csrf'] = tokens['csrf_token']
+            headers[tokens.get('csrf_header') or 'X-XSRF-TOKEN'] = tokens['csrf_token']
+        return 'POST', '/api/translate/text', fields, headers
+
+    def parse_response(self, body):
+        data = json.loads(body)
+        if not data.get('success', True) and 'csrf' in str(data.get('code', '')).lower():
+            raise TokenExpired(str(data.get('code')))
+        return (data.get('data') or {}).get('translateText') or None
+
+
+if __name__ == '__main__':
+    # 对本地替身接口自检：翻译结果、同一引擎的实例共用会话和连接池、并发请求遇到令牌失效时只重新获取一次
+    from concurrent.futures import ThreadPoolExecutor
+
+    from benchmark import MockAliApi, MockTranslationServer
+    # 与 web_translator 注册的是同一个类，而不是本模块作为 __main__ 运行时的副本
+    from http_translator import AliHttpTranslator as Translator, HttpTranslator as Base
+
+    server = MockTranslationServer().start()
+    api = MockAliApi()
+    base_url = api.mount(server)
+    translators = [Translator(base_url=base_url, harvester=api.harvest) for _ in range(4)]
+    try:
+        assert len({id(translator.http) for translator in translators}) == 1
+        texts = [f"text {i}" for i in range(8)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda i: translators[i % 4].translate(texts[i]), range(8)))
+            assert results == [f"[ali-http] {text}" for text in texts], results
+            assert api.harvests == 1, api.harvests
+
+            api.rotate_token()
+            results = list(executor.map(lambda i: translators[i % 4].translate(texts[i]), range(8)))
+            assert results == [f"[ali-http] {text}" for text in texts], results
+            assert api.harvests == 2, api.harvests
+    finally:
+        for translator in translators:
+            translator.quit()
+        server.stop()
+    assert not Base._shared_sessions
+    print(f"自检通过：{api.requests} 次请求，{api.rejected} 次令牌失效，{api.harvests} 次获取令牌")
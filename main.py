@@ -1,29 +1,67 @@
+import time
+
+# 进程启动时刻，用于统计首次绘制和首次翻译的耗时
+PROCESS_START = time.perf_counter()
+
+import json
 import os
-import re
 import sys
 import threading
 from concurrent.futures import ThreadPoolExecutor
 
 import darkdetect
 import qdarktheme
-from PyQt5.QtCore import Qt, QPoint, QFile, QRectF, QObject, pyqtSignal, QThread
-from PyQt5.QtGui import QGuiApplication, QIcon, QColor, QPainter
+from PyQt5.QtCore import Qt, QPoint, QFile, QRectF, QObject, pyqtSignal, QThread, QEvent, QTimer
+from PyQt5.QtGui import QGuiApplication, QIcon, QColor, QPainter, QPixmap, QTextCursor
 from PyQt5.QtSvg import QSvgRenderer
 from PyQt5.QtWidgets import (QApplication, QMenu, QActionGroup, QAction,
-                             QHBoxLayout, QDialog, QLineEdit, QMessageBox)
+                             QHBoxLayout, QDialog, QLineEdit, QMessageBox, QCheckBox)
 from PyQt5.QtXml import QDomDocument
 from qframelesswindow import FramelessWindow, StandardTitleBar, TitleBarButton
 
 from main_window import Ui_MainForm
 from proxy_setting import Ui_ProxySettingForm
-from web_translator import BaiduTranslator, YoudaoTranslator, AliTranslator, CaiyunTranslator, \
-    TencentTranSmartTranslator, GoogleTranslator, DeepLTranslator
+import text_cleanup
+from memory_governor import MemoryGovernor
+from text_chunker import IncrementalDocument
+from translation_cache import TranslationCache
+from translation_job import TranslationJob, JobCancelled, JobDeadlineExceeded
+from translator_pool import TranslatorPoolManager
+from translator_supervisor import TranslatorSupervisor
+
+# 翻译引擎名称与翻译器类名的对应关系
+# web_translator 会导入 selenium，启动时不导入，首次需要翻译器时再加载
+TRANSLATOR_CLASSES = {
+    "百度翻译": 'BaiduTranslator',
+    "有道翻译": 'YoudaoTranslator',
+    "彩云翻译": 'CaiyunTranslator',
+    "阿里翻译": 'AliTranslator',
+    "腾讯翻译": 'TencentTranSmartTranslator',
+    "谷歌翻译": 'GoogleTranslator',
+    "DeepL翻译": 'DeepLTranslator',
+}
+DEFAULT_TRANSLATOR_CLASS = 'BaiduTranslator'
+
+# 设置此环境变量时，窗口首次绘制后输出启动耗时并退出，供 startup_benchmark.py 使用
+STARTUP_BENCHMARK_ENV = 'PYTRANSLATOR_STARTUP_BENCHMARK'
+
+
+def load_translator_class(class_name):
+    """按类名加载翻译器类，首次调用时才导入 web_translator 和 selenium"""
+    import web_translator
+    return getattr(web_translator, class_name)
 
 
 class TranslationSignals(QObject):
-    """翻译信号类，用于在线程间传递结果"""
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
+    """翻译信号类，用于在线程间传递结果，附带发起翻译时的请求序号"""
+    finished = pyqtSignal(int, str)
+    error = pyqtSignal(int, str)
+    # 按顺序就绪的部分译文，用于逐步显示
+    partial = pyqtSignal(int, str)
+
+class CleanupSignals(QObject):
+    """文本清理信号类，附带清理开始时原文的版本号"""
+    finished = pyqtSignal(int, str)
 
 class InitTranslatorThread(QThread):
     """初始化翻译器的线程"""
@@ -43,7 +81,14 @@ class InitTranslatorThread(QThread):
 
 # 重写，解决 svg 图像的前景色 fill 问题
 class SvgTitleBarButton(TitleBarButton):
-    """ Title bar button using svg icon """
+    """ Title bar button using svg icon
+
+    渲染好的图标按 (图标路径, 颜色, 尺寸, 设备像素比) 缓存为 QPixmap，各按钮共用，
+    重绘时只绘制背景并贴图，不再每次修改 svg 并重新解析渲染。
+    """
+
+    # (图标路径, 颜色, 宽, 高, 设备像素比) -> QPixmap
+    _pixmapCache = {}
 
     def __init__(self, iconPath, parent=None):
         """
@@ -57,8 +102,14 @@ class SvgTitleBarButton(TitleBarButton):
         """
         super().__init__(parent)
         self._svgDom = QDomDocument()
+        self._iconPath = None
         self.setIcon(iconPath)
 
+    @classmethod
+    def clearPixmapCache(cls):
+        """ clear the rendered icons of all buttons, e.g. after the theme is toggled """
+        cls._pixmapCache.clear()
+
     def setIcon(self, iconPath):
         """ set the icon of button
 
@@ -72,6 +123,36 @@ class SvgTitleBarButton(TitleBarButton):
         self._svgDom.setContent(f.readAll())
         f.close()
 
+        # 图标文件可能已变化，丢弃该路径下已渲染的图标
+        self._iconPath = iconPath
+        for key in [key for key in self._pixmapCache if key[0] == iconPath]:
+            del self._pixmapCache[key]
+        self.update()
+
+    def _iconPixmap(self, color: QColor):
+        """ get the icon rendered with the given color, rendering it on the first use """
+        dpr = self.devicePixelRatioF()
+        key = (self._iconPath, color.name(QColor.HexArgb), self.width(), self.height(), dpr)
+        pixmap = self._pixmapCache.get(key)
+        if pixmap is None:
+            pathNodes = self._svgDom.elementsByTagName('path')
+            for i in range(pathNodes.length()):
+                element = pathNodes.at(i).toElement()
+                # fill属性设置对象内部的颜色，stroke属性设置绘制对象的线条的颜色。
+                # lement.setAttribute('stroke', color)  # 原始代码
+                element.setAttribute('fill', color.name())
+
+            pixmap = QPixmap(round(self.width() * dpr), round(self.height() * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+            renderer = QSvgRenderer(self._svgDom.toByteArray())
+            renderer.render(painter, QRectF(0, 0, self.width(), self.height()))
+            painter.end()
+            self._pixmapCache[key] = pixmap
+        return pixmap
+
     def paintEvent(self, e):
         painter = QPainter(self)
         painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
@@ -83,16 +164,7 @@ class SvgTitleBarButton(TitleBarButton):
         painter.drawRect(self.rect())
 
         # draw icon
-        color = color.name()
-        pathNodes = self._svgDom.elementsByTagName('path')
-        for i in range(pathNodes.length()):
-            element = pathNodes.at(i).toElement()
-            # fill属性设置对象内部的颜色，stroke属性设置绘制对象的线条的颜色。
-            # lement.setAttribute('stroke', color)  # 原始代码
-            element.setAttribute('fill', color)
-
-        renderer = QSvgRenderer(self._svgDom.toByteArray())
-        renderer.render(painter, QRectF(self.rect()))
+        painter.drawPixmap(0, 0, self._iconPixmap(color))
 
 # 主窗口
 class Window(FramelessWindow, Ui_MainForm):
@@ -138,17 +210,57 @@ class Window(FramelessWindow, Ui_MainForm):
 
         # 初始化翻译器和线程池
         self.driver_path = os.path.abspath('./browser_driver/msedgedriver.exe')
-        self.translator = None
+        # 每个翻译引擎保持的浏览器实例数量，翻译任务可并发执行
+        self.translator_pool_size = max(1, min(4, (os.cpu_count() or 2) // 2))
+        # 最近使用的翻译引擎保持预热的数量，切换到这些引擎时无需重新启动浏览器
+        self.warm_engine_count = 2
+        self.pool_manager = TranslatorPoolManager(self.driver_path, self.translator_pool_size, is_headless=True,
+                                                  max_engines=self.warm_engine_count)
+        # 定期检查空闲的浏览器，自动重启已崩溃或卡死的实例，回收内存占用过高的页面和浏览器
+        self.translator_supervisor = TranslatorSupervisor(self.pool_manager, governor=MemoryGovernor()).start()
+        self.translator_pool = None
         self.translation_signals = TranslationSignals()
-        self.translation_signals.finished.connect(self.on_translation_finished)
-        self.translation_signals.error.connect(self.on_translation_error)
-        self.thread_pool = ThreadPoolExecutor(max_workers=1)
+        self.translation_signals.finished.connect(self.on_task_finished)
+        self.translation_signals.error.connect(self.on_task_error)
+        self.translation_signals.partial.connect(self.on_task_partial)
+        # 已逐步显示到译文框中的请求序号，该请求完成时无需再整体替换译文
+        self.streamed_generation = None
+        # 逐步显示途中译文框被清空或替换的请求序号，该请求后续的部分译文不再追加
+        self.interrupted_generation = None
+        # 译文框只追加内容，关闭撤销记录以免大文本占用额外内存
+        self.target_plainTextEdit.setUndoRedoEnabled(False)
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.translator_pool_size)
+        # 翻译请求序号：每次发起翻译加一，只有最新请求的结果会显示，过期的请求被取消或丢弃
+        self.translation_generation = 0
+        self.translation_future = None
+        self.translation_job = None
+        # 单次翻译的整体超时时间（秒），包括排队、加载页面和等待结果
+        self.translation_timeout = 60
+        # 段落级增量翻译：再次翻译时只翻译内容变化的段落
+        self.incremental_document = IncrementalDocument()
+
+        # 实时翻译：输入停止一段时间后自动翻译
+        self.live_translate_checkBox = QCheckBox("实时翻译", self)
+        self.live_translate_checkBox.setToolTip("输入停止后自动翻译")
+        self.horizontalLayout_2.insertWidget(self.horizontalLayout_2.indexOf(self.translate_pushButton),
+                                             self.live_translate_checkBox)
+        self.live_translate_delay = 600
+        self.live_translate_timer = QTimer(self)
+        self.live_translate_timer.setSingleShot(True)
+        self.live_translate_timer.timeout.connect(self.translate)
+        # 文本清理在单独的线程中执行
+        self.cleanup_executor = ThreadPoolExecutor(max_workers=1)
+        self.cleanup_signals = CleanupSignals()
+        self.cleanup_signals.finished.connect(self.on_cleanup_finished)
+        # 翻译结果缓存
+        self.translation_cache = TranslationCache(os.path.abspath('./cache/translation_cache.db'))
 
         # 翻译器初始化状态
         self.translator_initializing = False
         self.translator_ready = False
-        # 在后台线程中初始化翻译器
-        self.init_translator_in_background()
+        # 启动耗时（秒，自进程启动起）：首次绘制、首次翻译完成
+        # 浏览器在窗口首次绘制后的空闲时刻才在后台启动，不阻塞窗口显示
+        self.startup_times = {}
 
         # 初始化主题菜单
         self.theme = 'auto'
@@ -172,7 +284,29 @@ class Window(FramelessWindow, Ui_MainForm):
         self.copy_target_pushButton.clicked.connect(self.copy_target)
         self.exchange_lang_pushButton.clicked.connect(self.exchange_language)
         self.translate_pushButton.clicked.connect(self.translate)
-        self.translate_comboBox.currentIndexChanged.connect(self.init_translator)
+        self.source_plainTextEdit.textChanged.connect(self.on_source_text_changed)
+        self.live_translate_checkBox.toggled.connect(self.on_source_text_changed)
+        self.translate_comboBox.currentIndexChanged.connect(self.switch_translator)
+
+    def event(self, e):
+        if e.type() == QEvent.Paint and 'first_paint' not in self.startup_times:
+            self.on_first_paint()
+        return super().event(e)
+
+    def on_first_paint(self):
+        """窗口首次绘制：记录耗时，并在事件循环空闲时再初始化翻译器"""
+        self.startup_times['first_paint'] = time.perf_counter() - PROCESS_START
+        print(f"首次绘制耗时: {self.startup_times['first_paint']:.3f} 秒")
+        if os.environ.get(STARTUP_BENCHMARK_ENV):
+            QTimer.singleShot(0, self.report_startup_and_quit)
+            return
+        QTimer.singleShot(0, self.init_translator_in_background)
+
+    def report_startup_and_quit(self):
+        print(json.dumps({'startup_times': self.startup_times,
+                          'web_translator_loaded': 'web_translator' in sys.modules}))
+        sys.stdout.flush()
+        QApplication.quit()
 
     def init_theme_menu(self):
         # 创建主题菜单
@@ -235,6 +369,8 @@ class Window(FramelessWindow, Ui_MainForm):
         else:
             return
 
+        # 旧颜色渲染的图标不再使用
+        SvgTitleBarButton.clearPixmapCache()
         self.toggle_buttons_theme(self.titleBar.minBtn, color)
         self.toggle_buttons_theme(self.titleBar.maxBtn, color)
         self.toggle_buttons_theme(self.titleBar.closeBtn, color)
@@ -305,54 +441,41 @@ class Window(FramelessWindow, Ui_MainForm):
 
     def clear_source(self):
         self.source_plainTextEdit.setPlainText('')
-        self.target_plainTextEdit.setPlainText('')
+        # 经由 translate() 清空译文，同时取消正在进行的翻译，未开启实时翻译时其结果也不会再显示
+        self.translate()
 
     def clear_newline(self):
-        source_text = self.source_plainTextEdit.toPlainText()
-        # 处理 Windows 换行符 \r\n
-        processed_text = re.sub(r'(\r\n)+', r'\r\n', source_text)
-        # 处理 Unix 换行符 \n
-        processed_text = re.sub(r'([^\r])\n+', r'\1\n', processed_text)
-        # 处理连续的 \r（Mac OS 9 及之前的系统）
-        processed_text = re.sub(r'\r+', r'\r', processed_text)
-        self.source_plainTextEdit.setPlainText(processed_text)
+        self.run_cleanup('newline')
 
     def clear_newline_all(self):
-        source_text = self.source_plainTextEdit.toPlainText()
-        # 处理换行符 \r\n
-        processed_text = re.sub(r'[\r\n]+', '', source_text)
-        self.source_plainTextEdit.setPlainText(processed_text)
+        self.run_cleanup('newline_all')
 
     # 中文直接没空格、英文单词之间只有一个空格，删除多余的空格
     def clear_blank(self):
-        source_text = self.source_plainTextEdit.toPlainText()
-        # 1. 删除中文文本中的多余空格
-        processed_text = re.sub(
-            r'([\u4e00-\u9fa5\u3000-\u303f\uff00-\uffef])([\t \u3000]+)([\u4e00-\u9fa5\u3000-\u303f\uff00-\uffef])', r'\1\3',
-            source_text)
-
-        # 2. 处理英文文本中的连续空格
-        processed_text = re.sub(r'[\t \u3000]+', r' ', processed_text)
+        self.run_cleanup('blank')
 
-        # 3. 处理连字符与字母之间的空格
-        # 删除字母与连字符之间的空格
-        processed_text = re.sub(r'([a-zA-Z]*)[\t \u3000]*-[\t \u3000]*([a-zA-Z]*)', r'\1-\2', processed_text)
-
-        # 4. 保留英文单词之间的空格
-        processed_text = re.sub(r'(\b[a-zA-Z0-9]+\b)[\t \u3000]+(\b[a-zA-Z0-9]+\b)', r'\1 \2', processed_text)
+    def clear_blank_all(self):
+        self.run_cleanup('blank_all')
 
-        # 5. 处理中英文混合场景
-        processed_text = re.sub(r'([\u4e00-\u9fa5])([\t \u3000]*)([a-zA-Z])', r'\1\3', processed_text)
-        processed_text = re.sub(r'([a-zA-Z])([\t \u3000]*)([\u4e00-\u9fa5])', r'\1\3', processed_text)
+    def run_cleanup(self, mode):
+        """在后台线程中清理原文，避免大文本阻塞界面"""
+        text = self.source_plainTextEdit.toPlainText()
+        revision = self.source_plainTextEdit.document().revision()
+        self.cleanup_executor.submit(self._cleanup_task, mode, text, revision)
 
-        # 6. 清理剩余空格
-        processed_text = processed_text.strip()
-        self.source_plainTextEdit.setPlainText(processed_text)
+    def _cleanup_task(self, mode, text, revision):
+        try:
+            result = text_cleanup.cleanup(text, mode)
+        except Exception as e:
+            print(f"文本清理失败: {str(e)}")
+            return
+        if result != text:
+            self.cleanup_signals.finished.emit(revision, result)
 
-    def clear_blank_all(self):
-        source_text = self.source_plainTextEdit.toPlainText()
-        processed_text = re.sub(r'[\t \u3000]+', r'', source_text)
-        self.source_plainTextEdit.setPlainText(processed_text)
+    def on_cleanup_finished(self, revision, result):
+        # 清理期间原文又被编辑过时丢弃结果，避免覆盖新的输入
+        if revision == self.source_plainTextEdit.document().revision():
+            self.source_plainTextEdit.setPlainText(result)
 
     def copy_source(self):
         source_text = self.source_plainTextEdit.toPlainText()
@@ -385,71 +508,41 @@ class Window(FramelessWindow, Ui_MainForm):
     def init_translator(self):
         """初始化翻译器"""
         try:
-            proxy_config = {
-                "using": self.proxy_using,
-                "protocol": self.proxy_protocol,
-                "address": self.proxy_address,
-                "port": self.proxy_port,
-                "username": self.proxy_username,
-                "password": self.proxy_password,
-            }
-
             # 检查驱动文件是否存在
             if not os.path.exists(self.driver_path):
                 raise FileNotFoundError(f"浏览器驱动文件不存在: {self.driver_path}")
 
-            if self.translate_comboBox.currentText() == "百度翻译":
-                self.translator = BaiduTranslator(
-                    self.driver_path,
-                    is_headless=True,
-                    proxy_config=proxy_config
-                )
-            elif self.translate_comboBox.currentText() == "有道翻译":
-                self.translator = YoudaoTranslator(
-                    self.driver_path,
-                    is_headless=True,
-                    proxy_config=proxy_config
-                )
-            elif self.translate_comboBox.currentText() == "彩云翻译":
-                self.translator = CaiyunTranslator(
-                    self.driver_path,
-                    is_headless=True,
-                    proxy_config=proxy_config
-                )
-            elif self.translate_comboBox.currentText() == "阿里翻译":
-                self.translator = AliTranslator(
-                    self.driver_path,
-                    is_headless=True,
-                    proxy_config=proxy_config
-                )
-            elif self.translate_comboBox.currentText() == "腾讯翻译":
-                self.translator = TencentTranSmartTranslator(
-                    self.driver_path,
-                    is_headless=True,
-                    proxy_config=proxy_config
-                )
-            elif self.translate_comboBox.currentText() == "谷歌翻译":
-                self.translator = GoogleTranslator(
-                    self.driver_path,
-                    is_headless=True,
-                    proxy_config=proxy_config
-                )
-            elif self.translate_comboBox.currentText() == "DeepL翻译":
-                self.translator = DeepLTranslator(
-                    self.driver_path,
-                    is_headless=True,
-                    proxy_config=proxy_config
-                )
-            else:
-                # 默认百度翻译
-                self.translator = BaiduTranslator(
-                    self.driver_path,
-                    is_headless=True,
-                    proxy_config=proxy_config
-                )
+            # 代理配置变化时，已有的浏览器实例会被关闭并按新配置重新创建
+            self.pool_manager.set_proxy_config(self.proxy_config())
+            self.translator_pool = self.pool_manager.get_pool(self.current_translator_class())
+            self.translator_pool.warm_up()
         except Exception as e:
             print(f"翻译器初始化失败: {str(e)}")
 
+    def switch_translator(self):
+        """切换翻译引擎：立即切换到对应的池，浏览器在后台预热，超出预热数量的引擎会被关闭"""
+        self.pool_manager.set_proxy_config(self.proxy_config())
+        self.translator_pool = self.pool_manager.prewarm(self.current_translator_class())
+
+    def proxy_config(self):
+        """当前的代理配置"""
+        return {
+            "using": self.proxy_using,
+            "protocol": self.proxy_protocol,
+            "address": self.proxy_address,
+            "port": self.proxy_port,
+            "username": self.proxy_username,
+            "password": self.proxy_password,
+        }
+
+    def current_engine_name(self):
+        """当前选择的翻译器类名，默认百度翻译，无需导入 web_translator"""
+        return TRANSLATOR_CLASSES.get(self.translate_comboBox.currentText(), DEFAULT_TRANSLATOR_CLASS)
+
+    def current_translator_class(self):
+        """当前选择的翻译器类"""
+        return load_translator_class(self.current_engine_name())
+
     def on_translator_ready(self):
         """翻译器初始化完成后的回调"""
         self.translator_initializing = False
@@ -465,32 +558,138 @@ class Window(FramelessWindow, Ui_MainForm):
         # 更新翻译按钮状态
         self.translate_pushButton.setEnabled(False)
 
-    def translate(self):
-        if not self.translator:
-            self.init_translator()
+    def on_source_text_changed(self):
+        """实时翻译模式下，每次编辑都重新开始计时，输入停止 live_translate_delay 毫秒后才翻译"""
+        if self.live_translate_checkBox.isChecked():
+            self.live_translate_timer.start(self.live_translate_delay)
+        else:
+            self.live_translate_timer.stop()
 
+    def translate(self):
+        self.live_translate_timer.stop()
         text = self.source_plainTextEdit.toPlainText()
+
+        # 新请求使之前的请求过期：尚未开始的直接取消，执行中的在下一个检查点中止，结果不再显示
+        self.translation_generation += 1
+        generation = self.translation_generation
+        self.cancel_translation()
+
+        # 原文被清空时同时清空译文，正在进行的翻译已被取消，其结果不会再显示
         if not text.strip():
+            self.set_target_text('')
+            return
+
+        source_lang = self.source_lang_comboBox.currentText()
+        target_lang = self.target_lang_comboBox.currentText()
+
+        # 命中缓存时直接显示结果，无需等待浏览器
+        cached = self.translation_cache.get(self.current_engine_name(), source_lang, target_lang, text)
+        if cached is not None:
+            self.on_translation_finished(cached)
             return
 
+        if not self.translator_pool:
+            # 不在界面线程中等待浏览器启动：池在后台预热，翻译任务在借用翻译器时排队等待
+            self.switch_translator()
+
         # 在线程池中执行翻译任务
-        self.thread_pool.submit(self._translate_task, text)
+        self.translation_job = TranslationJob(self.translation_timeout)
+        self.translation_future = self.thread_pool.submit(self._translate_task, generation, self.translation_job,
+                                                          text, source_lang, target_lang)
+
+    def cancel_translation(self):
+        """取消正在进行的翻译"""
+        if self.translation_future is not None:
+            self.translation_future.cancel()
+            self.translation_future = None
+        if self.translation_job is not None:
+            self.translation_job.cancel()
+            self.translation_job = None
+
+    def is_stale(self, generation):
+        """请求是否已被更新的请求取代"""
+        return generation != self.translation_generation
+
+    def _translate_task(self, generation, job, text, source_lang, target_lang):
+        pool = self.translator_pool
+
+        def translate_chunk(chunk):
+            # 任务取消或超时后不再翻译剩余的片段
+            job.check()
+            return self.translation_cache.translate(pool, chunk, source_lang, target_lang, job=job)
 
-    def _translate_task(self, text):
         try:
-            result = self.translator.translate(text)
+            # 按段落翻译，未变化的段落复用上次的译文；相邻的变化段落合并为一次请求，过长的段落按句子切分
+            result = self.incremental_document.translate(
+                translate_chunk, text, pool.max_text_length, pool.size, (pool.engine_name, source_lang, target_lang),
+                lambda piece: self.translation_signals.partial.emit(generation, piece)
+            )
             if result:
-                self.translation_signals.finished.emit(result)
+                # 整篇译文也写入缓存，再次翻译同一文档时可立即返回
+                self.translation_cache.put(pool.engine_name, source_lang, target_lang, text, result)
+                self.translation_signals.finished.emit(generation, result)
             else:
-                self.translation_signals.error.emit("翻译失败，未获取到结果")
+                self.translation_signals.error.emit(generation, "翻译失败，未获取到结果")
+        except JobCancelled:
+            pass
+        except JobDeadlineExceeded:
+            self.translation_signals.error.emit(generation, f"翻译超时（{job.timeout} 秒）")
         except Exception as e:
-            self.translation_signals.error.emit(f"翻译过程中发生错误: {str(e)}")
+            self.translation_signals.error.emit(generation, f"翻译过程中发生错误: {str(e)}")
 
-    def on_translation_finished(self, result):
-        self.target_plainTextEdit.setPlainText(result)
+    def on_task_partial(self, generation, piece):
+        """把就绪的部分译文追加到译文框末尾，不重新排版已有内容"""
+        if self.is_stale(generation) or generation == self.interrupted_generation:
+            return
+        if self.streamed_generation != generation:
+            # 新请求的第一部分，清空上一次的译文
+            self.streamed_generation = generation
+            self.target_plainTextEdit.clear()
+        cursor = QTextCursor(self.target_plainTextEdit.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(piece)
+
+    def on_task_finished(self, generation, result):
+        # 丢弃过期请求的结果
+        if self.is_stale(generation):
+            return
+        if self.streamed_generation == generation:
+            # 译文已经逐步显示完整，只记录完成状态
+            self.streamed_generation = None
+            self.on_translation_finished(result, displayed=True)
+        else:
+            self.on_translation_finished(result)
+
+    def on_task_error(self, generation, error_msg):
+        if not self.is_stale(generation):
+            self.on_translation_error(error_msg)
+
+    def set_target_text(self, text):
+        """替换译文框的内容；正在逐步显示的请求不再追加后续的部分译文，以免只显示残缺的片段"""
+        if self.streamed_generation is not None:
+            self.interrupted_generation = self.streamed_generation
+            self.streamed_generation = None
+        self.target_plainTextEdit.setPlainText(text)
+
+    def on_translation_finished(self, result, displayed=False):
+        if not displayed:
+            self.set_target_text(result)
+        if 'first_translation' not in self.startup_times:
+            self.startup_times['first_translation'] = time.perf_counter() - PROCESS_START
+            print(f"首次翻译耗时: {self.startup_times['first_translation']:.3f} 秒")
 
     def on_translation_error(self, error_msg):
-        self.target_plainTextEdit.setPlainText(f"翻译错误: {error_msg}")
+        self.set_target_text(f"翻译错误: {error_msg}")
+
+    def closeEvent(self, e):
+        # 关闭所有浏览器实例
+        self.cancel_translation()
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        self.cleanup_executor.shutdown(wait=False, cancel_futures=True)
+        self.translator_supervisor.stop()
+        self.pool_manager.close()
+        self.translation_cache.close()
+        super().closeEvent(e)
 
 if __name__ == '__main__':
     qdarktheme.enable_hi_dpi()
@@ -0,0 +1,74 @@
+"""长时间运行的翻译器的内存管理
+
+翻译页面是单页应用，长时间复用会话页面时内存会缓慢增长。MemoryGovernor 在翻译器空闲时
+（由 TranslatorSupervisor 定期检查）读取其内存占用：
+
+    浏览器进程（含子进程）的常驻内存，需要安装 psutil
+    翻译页面的 JS 堆，通过 CDP Performance.getMetrics 获取
+
+页面 JS 堆或自上次加载以来的翻译次数超过上限时回收页面（下次翻译重新加载），
+浏览器常驻内存超过上限时关闭并重新启动浏览器。
+"""
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MB = 1024 * 1024
+
+
+def process_tree_rss(pid):
+    """进程及其所有子进程的常驻内存之和（字节），无 psutil 或进程不存在时返回 None"""
+    if psutil is None or pid is None:
+        return None
+    try:
+        process = psutil.Process(pid)
+        return sum(p.memory_info().rss for p in [process] + process.children(recursive=True))
+    except psutil.Error:
+        return None
+
+
+class MemoryGovernor:
+    """根据内存占用和翻译次数决定是否回收页面或重启浏览器"""
+
+    RECYCLE_PAGE = 'recycle_page'
+    RESTART_BROWSER = 'restart_browser'
+
+    def __init__(self, max_rss=1536 * MB, max_js_heap=256 * MB, max_page_translations=500):
+        """
+        Args:
+            max_rss: 浏览器进程（含子进程）常驻内存的上限（字节），超出时重启浏览器，None 表示不限制
+            max_js_heap: 翻译页面已用 JS 堆的上限（字节），超出时回收页面，None 表示不限制
+            max_page_translations: 同一次页面加载内的翻译次数上限，超出时回收页面，None 表示不限制
+        """
+        self.max_rss = max_rss
+        self.max_js_heap = max_js_heap
+        self.max_page_translations = max_page_translations
+        if max_rss and psutil is None:
+            print("未安装 psutil，无法读取浏览器进程的常驻内存，浏览器内存上限（max_rss）不会生效")
+
+    def decide(self, usage):
+        """根据 memory_usage() 的结果决定要执行的操作
+
+        Returns:
+            RESTART_BROWSER、RECYCLE_PAGE 或 None
+        """
+        if self.max_rss and (usage.get('rss') or 0) > self.max_rss:
+            return self.RESTART_BROWSER
+        if self.max_js_heap and (usage.get('js_heap_used') or 0) > self.max_js_heap:
+            return self.RECYCLE_PAGE
+        if self.max_page_translations and usage.get('page_translations', 0) >= self.max_page_translations:
+            return self.RECYCLE_PAGE
+        return None
+
+    def inspect(self, translator):
+        """读取空闲翻译器的内存占用并决定操作，不支持内存统计的翻译器返回 (None, None)
+
+        Returns:
+            (内存占用, 操作)
+        """
+        memory_usage = getattr(translator, 'memory_usage', None)
+        if memory_usage is None:
+            return None, None
+        usage = memory_usage()
+        return usage, self.decide(usage)
@@ -0,0 +1,91 @@
+"""图形界面启动耗时基准测试
+
+多次以无窗口模式（QT_QPA_PLATFORM=offscreen）启动 main.py，窗口首次绘制后立即退出，
+统计首次绘制耗时，并确认启动过程没有提前导入 web_translator（selenium）。
+同时单独测量导入 web_translator 的耗时，即被推迟到后台的开销。
+
+用法示例:
+    python startup_benchmark.py --runs 5 --max-first-paint 1.5 -o startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from main import STARTUP_BENCHMARK_ENV
+from translation_race import percentile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_once(timeout=60):
+    """启动一次图形界面，返回 main.py 输出的启动统计和进程总耗时"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', **{STARTUP_BENCHMARK_ENV: '1'})
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, os.path.join(ROOT, 'main.py')], cwd=ROOT, env=env,
+                               capture_output=True, text=True, timeout=timeout)
+    wall = time.perf_counter() - start
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith('{'):
+            report = json.loads(line)
+            report['wall'] = wall
+            return report
+    raise RuntimeError(f"未获取到启动统计（退出码 {completed.returncode}）: {completed.stderr.strip()[-500:]}")
+
+
+def measure_import(module, timeout=60):
+    """在新进程中测量导入某个模块的耗时（秒）"""
+    code = f"import time; s = time.perf_counter(); import {module}; print(time.perf_counter() - s)"
+    completed = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True,
+                               timeout=timeout)
+    if completed.returncode:
+        return None
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='PyTranslator 图形界面启动耗时基准测试')
+    parser.add_argument('--runs', type=int, default=5, help='启动次数')
+    parser.add_argument('--max-first-paint', type=float, help='首次绘制耗时中位数的上限（秒），超出时返回非零退出码')
+    parser.add_argument('-o', '--output', help='结果 JSON 文件，默认输出到标准输出')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    runs = [run_once() for _ in range(args.runs)]
+    first_paints = [run['startup_times']['first_paint'] for run in runs]
+    report = {
+        'runs': args.runs,
+        'first_paint': {
+            'min': min(first_paints),
+            'p50': percentile(first_paints, 50),
+            'max': max(first_paints),
+        },
+        'wall_p50': percentile([run['wall'] for run in runs], 50),
+        # 启动过程中不应导入 web_translator
+        'web_translator_loaded': any(run['web_translator_loaded'] for run in runs),
+        'deferred_import_web_translator': measure_import('web_translator'),
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    failed = report['web_translator_loaded']
+    if report['web_translator_loaded']:
+        print("启动过程中导入了 web_translator", file=sys.stderr)
+    if args.max_first_paint is not None and report['first_paint']['p50'] > args.max_first_paint:
+        print(f"首次绘制耗时 {report['first_paint']['p50']:.3f} 秒超过上限 {args.max_first_paint} 秒",
+              file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
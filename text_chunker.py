@@ -0,0 +1,367 @@
+import hashlib
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# 段落分隔：换行后跟至少一个空行
+_PARAGRAPH_SPLIT_RE = re.compile(r'((?:\r\n|\r|\n)(?:[ \t　]*(?:\r\n|\r|\n))+)')
+# 行分隔
+_LINE_SPLIT_RE = re.compile(r'(\r\n|\r|\n)')
+# 句子分隔：中文句末标点（可带后引号）后直接断开；英文句末标点需后跟空白，避免误断小数和缩写
+_SENTENCE_SPLIT_RE = re.compile(
+    r'((?:(?<=[。！？；…])|(?<=[。！？；…][”’」』）]))(?![”’」』）。！？；…])[ \t　]*'
+    r'|(?:(?<=[.!?;])|(?<=[.!?;]["\')\]]))[ \t]+)'
+)
+
+_SPLIT_LEVELS = (_PARAGRAPH_SPLIT_RE, _LINE_SPLIT_RE, _SENTENCE_SPLIT_RE)
+_BLANK_RUN_RE = re.compile(r'\s+')
+
+
+def split_text(text, max_length):
+    """按段落、行、句子的优先级把文本切分为不超过 max_length 的片段
+
+    Args:
+        text: 原文
+        max_length: 每个待翻译片段的最大长度
+
+    Returns:
+        [(片段, 是否需要翻译), ...]，不需要翻译的片段是原样保留的空白和换行，
+        按顺序拼接所有片段即得到原文
+    """
+    stripped = text.strip()
+    if not stripped:
+        return [(text, False)] if text else []
+
+    start = text.index(stripped)
+    segments = []
+    if start:
+        segments.append((text[:start], False))
+    segments.extend(_split_level(stripped, max_length, 0))
+    if start + len(stripped) < len(text):
+        segments.append((text[start + len(stripped):], False))
+    return segments
+
+
+def _split_level(text, max_length, level):
+    if len(text) <= max_length:
+        return [(text, True)]
+    if level >= len(_SPLIT_LEVELS):
+        return _split_by_length(text, max_length)
+
+    parts = _SPLIT_LEVELS[level].split(text)
+    pieces, separators = parts[0::2], parts[1::2]
+
+    segments = []
+    current = None
+    for i, piece in enumerate(pieces):
+        separator = separators[i - 1] if i else ''
+        # 尽量把相邻片段连同分隔符合并，减少翻译调用次数
+        if current is not None and len(current) + len(separator) + len(piece) <= max_length:
+            current += separator + piece
+            continue
+
+        if current is not None:
+            segments.append((current, bool(current.strip())))
+        if separator:
+            segments.append((separator, False))
+
+        if len(piece) > max_length:
+            # 单个片段仍然过长，交给下一级切分
+            segments.extend(_split_level(piece, max_length, level + 1))
+            current = None
+        else:
+            current = piece
+
+    if current is not None:
+        segments.append((current, bool(current.strip())))
+    return segments
+
+
+def _split_by_length(text, max_length):
+    """没有可用的自然边界时按长度切分：尽量在最后一个空白处断开，避免拆开单词，
+    整段没有空白时才按长度硬切；空白单独成段且不需要翻译"""
+    segments = []
+    start = 0
+    while start < len(text):
+        blank = _BLANK_RUN_RE.match(text, start)
+        if blank:
+            segments.append((blank.group(), False))
+            start = blank.end()
+            continue
+
+        end = start + max_length
+        if end >= len(text):
+            piece = text[start:].rstrip()
+            segments.append((piece, True))
+            start += len(piece)
+            continue
+
+        cut = end
+        while cut > start and not text[cut].isspace():
+            cut -= 1
+        while cut > start and text[cut - 1].isspace():
+            cut -= 1
+        if cut == start:
+            cut = end
+        segments.append((text[start:cut], True))
+        start = cut
+    return segments
+
+
+def translate_document(translate, text, max_length, max_workers=1, on_output=None):
+    """分段并行翻译长文本，并按原顺序拼接结果，保留原文的空白和换行
+
+    Args:
+        translate: 翻译单个片段的可调用对象，接收文本，返回译文或None
+        text: 原文
+        max_length: 每个片段的最大长度
+        max_workers: 并行翻译的片段数量
+        on_output: 可选的回调，译文的前缀一旦连续就绪就按顺序传出新的部分，
+            依次拼接所有回调的内容即得到完整译文
+
+    Returns:
+        完整译文，任一片段翻译失败时返回 None
+    """
+    segments = split_text(text, max_length)
+    pending = [segment for segment, translatable in segments if translatable]
+    if len(pending) == 1 and len(segments) == 1:
+        result = translate(pending[0])
+        if result and on_output is not None:
+            on_output(result)
+        return result
+
+    output = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+        # map 按提交顺序产出结果，前面的片段完成后即可输出，无需等待全部完成
+        results = executor.map(translate, pending)
+        for segment, translatable in segments:
+            piece = next(results) if translatable else segment
+            if not piece:
+                return None
+            output.append(piece)
+            if on_output is not None:
+                on_output(piece)
+    return ''.join(output)
+
+
+def split_paragraphs(text):
+    """按行把文本切分为段落（界面中的段落即一行，清除换行后每段占一行）
+
+    Returns:
+        [(片段, 是否需要翻译), ...]，空行、换行符和行首尾的空白原样保留，
+        按顺序拼接所有片段即得到原文
+    """
+    segments = []
+    for i, part in enumerate(_LINE_SPLIT_RE.split(text)):
+        if i % 2 or not part.strip():
+            if part:
+                segments.append((part, False))
+            continue
+        stripped = part.strip()
+        start = part.index(stripped)
+        if start:
+            segments.append((part[:start], False))
+        segments.append((stripped, True))
+        if start + len(stripped) < len(part):
+            segments.append((part[start + len(stripped):], False))
+    return segments
+
+
+def paragraph_fingerprint(paragraph):
+    return hashlib.sha1(paragraph.encode('utf-8')).hexdigest()
+
+
+def _plan_requests(segments, segment_fingerprints, changed, max_length):
+    """把需要翻译的段落合并为翻译请求
+
+    相邻的变化段落连同其间的换行合并为一次请求，合并后不超过 max_length；
+    遇到复用的段落、重复的段落或超长段落时断开。
+
+    Returns:
+        [('merged', 请求文本, [(指纹, 段落), ...]) 或 ('split', 超长段落, 指纹), ...]
+    """
+    plan = []
+    group = []
+    request = ''
+    separator = ''
+    scheduled = set()
+
+    def close():
+        nonlocal group, request
+        if group:
+            plan.append(('merged', request, group))
+        group, request = [], ''
+
+    for (segment, translatable), fp in zip(segments, segment_fingerprints):
+        if not translatable:
+            separator += segment
+            continue
+        if fp not in changed or fp in scheduled:
+            close()
+        elif len(segment) > max_length:
+            close()
+            plan.append(('split', segment, fp))
+        elif group and len(request) + len(separator) + len(segment) <= max_length:
+            request += separator + segment
+            group.append((fp, segment))
+        else:
+            close()
+            request = segment
+            group = [(fp, segment)]
+        if fp in changed:
+            scheduled.add(fp)
+        separator = ''
+    close()
+    return plan
+
+
+class IncrementalDocument:
+    """段落级增量翻译
+
+    记住上一次翻译中每个段落（按指纹）的译文，再次翻译时只把内容变化的段落发给翻译引擎，
+    其余段落直接复用，编辑的开销与改动量成正比，而不是与文档长度成正比。
+    相邻的变化段落连同其间的换行合并为不超过 max_length 的一次请求，超长段落按句子切分，
+    所有请求并行执行，请求数量与 translate_document 一次性翻译整篇文本相当。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._context = None
+        self._translations = {}
+        self.last_stats = {'paragraphs': 0, 'translated': 0, 'reused': 0, 'requests': 0}
+
+    def translate(self, translate, text, max_length, max_workers=1, context=None, on_output=None):
+        """翻译文档，只翻译变化的段落
+
+        Args:
+            translate: 翻译单个片段的可调用对象，接收文本，返回译文或None
+            text: 原文
+            max_length: 每个片段的最大长度，更长的段落按句子切分
+            max_workers: 并行执行的翻译请求数量
+            context: 翻译上下文（如引擎和语言），变化时丢弃已记住的译文
+            on_output: 可选的回调，按原文顺序传出已就绪的译文部分（复用的段落立即传出），
+                依次拼接所有回调的内容即得到完整译文
+
+        Returns:
+            完整译文，任一段落翻译失败时返回 None；已成功的段落仍会被记住
+        """
+        segments = split_paragraphs(text)
+        segment_fingerprints = [paragraph_fingerprint(segment) if translatable else None
+                                for segment, translatable in segments]
+        fingerprints = {}
+        for (segment, _), fp in zip(segments, segment_fingerprints):
+            if fp is not None:
+                fingerprints.setdefault(fp, segment)
+
+        with self._lock:
+            if context != self._context:
+                self._context = context
+                self._translations = {}
+            translations = {fp: self._translations[fp] for fp in fingerprints if fp in self._translations}
+        changed = {fp: paragraph for fp, paragraph in fingerprints.items() if fp not in translations}
+        self.last_stats = {'paragraphs': len(fingerprints), 'translated': len(changed),
+                           'reused': len(fingerprints) - len(changed), 'requests': 0}
+
+        emitted = 0
+
+        def flush():
+            # 按顺序传出已就绪的连续部分，遇到尚未翻译完的段落即停止
+            nonlocal emitted
+            while emitted < len(segments):
+                fp = segment_fingerprints[emitted]
+                if fp is not None and fp not in translations:
+                    break
+                on_output(translations[fp] if fp is not None else segments[emitted][0])
+                emitted += 1
+
+        if on_output is not None:
+            flush()
+
+        failed = False
+        if changed:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                futures = {}
+
+                def submit(request, task):
+                    futures[executor.submit(translate, request)] = task
+                    self.last_stats['requests'] += 1
+
+                for kind, request, group in _plan_requests(segments, segment_fingerprints, changed, max_length):
+                    if kind == 'merged':
+                        submit(request, (kind, group))
+                        continue
+                    # 超长段落：各片段分别翻译，全部完成后按顺序拼接
+                    fp, pieces = group, split_text(request, max_length)
+                    state = {'outputs': [piece for piece, _ in pieces],
+                             'remaining': sum(1 for _, translatable in pieces if translatable)}
+                    for index, (piece, translatable) in enumerate(pieces):
+                        if translatable:
+                            submit(piece, ('piece', (fp, state, index)))
+
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    completed = []
+                    for future in done:
+                        kind, detail = futures.pop(future)
+                        result = future.result()
+                        if not result:
+                            failed = True
+                            continue
+                        if kind == 'piece':
+                            fp, state, index = detail
+                            state['outputs'][index] = result
+                            state['remaining'] -= 1
+                            if not state['remaining']:
+                                completed.append((fp, ''.join(state['outputs'])))
+                        elif len(detail) == 1:
+                            completed.append((detail[0][0], result))
+                        else:
+                            lines = [line.strip() for line in _LINE_SPLIT_RE.split(result)[0::2] if line.strip()]
+                            if len(lines) == len(detail):
+                                completed.extend((fp, line) for (fp, _), line in zip(detail, lines))
+                            else:
+                                # 译文的行数与原文段落数对不上，无法拆回各段落，改为逐段翻译
+                                for fp, paragraph in detail:
+                                    submit(paragraph, ('merged', [(fp, paragraph)]))
+
+                    for fp, result in completed:
+                        translations[fp] = result
+                        # 每个段落完成后立即记住，翻译中途取消或出错时已完成的段落下次仍可复用
+                        with self._lock:
+                            if context == self._context:
+                                self._translations[fp] = result
+                    if completed and on_output is not None:
+                        flush()
+        if failed:
+            return None
+
+        with self._lock:
+            if context == self._context:
+                # 只保留当前文档的段落，避免记录无限增长
+                self._translations = dict(translations)
+        return ''.join(translations[fp] if fp is not None else segment
+                       for (segment, _), fp in zip(segments, segment_fingerprints))
+
+    def clear(self):
+        with self._lock:
+            self._translations = {}
+
+
+if __name__ == '__main__':
+    # 随机文本校验切分结果：拼接后与原文一致，需要翻译的片段不超过长度上限且不是空白
+    import random
+
+    rng = random.Random(0)
+    alphabet = list('abc xyz。！？.!? 中文') + ['\n', '\n\n', '\r\n', '\t', '        ', 'x' * 15]
+    checked = 0
+    for _ in range(20000):
+        sample = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        limit = rng.randint(1, 20)
+        for parts in (split_text(sample, limit), split_paragraphs(sample)):
+            assert ''.join(part for part, _ in parts) == sample, (sample, limit, parts)
+            assert all(part.strip() for part, translatable in parts if translatable), (sample, limit, parts)
+        assert all(len(part) <= limit for part, translatable in split_text(sample, limit) if translatable)
+        checked += 1
+    assert split_text('x' * 10 + ' ' * 12 + 'y' * 10, 10) == [('x' * 10, True), (' ' * 12, False), ('y' * 10, True)]
+    assert split_text('hello brave new world', 12) == [('hello brave', True), (' ', False), ('new world', True)]
+    print(f"已校验 {checked} 个随机文本")
@@ -0,0 +1,151 @@
+import re
+
+from selenium.webdriver.common.action_chains import ActionChains
+
+# 读取输入框当前内容（可编辑区域取其根节点的全部文本）
+_READ_INPUT_JS = """
+const el = arguments[0];
+if (!el.isContentEditable && typeof el.value === 'string') return el.value;
+const root = el.isContentEditable ? (el.closest('[contenteditable]') || el) : el;
+return root.innerText;
+"""
+
+# 聚焦输入框，并将光标移动到内容末尾
+_FOCUS_INPUT_JS = """
+const el = arguments[0];
+const root = el.isContentEditable ? (el.closest('[contenteditable]') || el) : el;
+root.focus();
+if (root.isContentEditable) {
+    const range = document.createRange();
+    range.selectNodeContents(root);
+    range.collapse(false);
+    const selection = window.getSelection();
+    selection.removeAllRanges();
+    selection.addRange(range);
+}
+"""
+
+# 清空输入框，注入失败后恢复到空白状态
+_CLEAR_INPUT_JS = """
+const el = arguments[0];
+if (!el.isContentEditable && typeof el.value === 'string') {
+    const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, '');
+    el.dispatchEvent(new InputEvent('input', {bubbles: true, inputType: 'deleteContentBackward'}));
+    return;
+}
+const root = el.closest('[contenteditable]') || el;
+root.focus();
+document.execCommand('selectAll', false, null);
+document.execCommand('delete', false, null);
+"""
+
+# 通过原生 value setter 设置文本并派发 input 事件（兼容 React/Vue 等受控组件）
+_NATIVE_VALUE_JS = """
+const el = arguments[0], text = arguments[1];
+if (el.isContentEditable || typeof el.value !== 'string') return false;
+const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, text);
+el.dispatchEvent(new InputEvent('input', {bubbles: true, inputType: 'insertText', data: text}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+return true;
+"""
+
+# 在可编辑区域末尾通过 Range + execCommand 插入文本，会触发编辑器监听的 beforeinput/input 事件
+_CONTENTEDITABLE_RANGE_JS = """
+const el = arguments[0], text = arguments[1];
+if (!el.isContentEditable) return false;
+const root = el.closest('[contenteditable]') || el;
+root.focus();
+const range = document.createRange();
+range.selectNodeContents(root);
+range.collapse(false);
+const selection = window.getSelection();
+selection.removeAllRanges();
+selection.addRange(range);
+return document.execCommand('insertText', false, text);
+"""
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class TextInjector:
+    """输入框文本注入器
+
+    按顺序尝试多种注入策略，通过回读输入框内容确认页面框架是否接受了注入的文本，
+    成功的策略会被记住并在之后优先使用。所有批量策略都失败时才退回逐键输入。
+
+    可用策略:
+        cdp_insert_text: CDP Input.insertText，相当于一次输入法提交
+        native_value: 原生 value setter + input 事件，适用于 textarea/input
+        contenteditable_range: Range + execCommand('insertText')，适用于可编辑 div
+        keystrokes: ActionChains 逐键输入（最慢，兜底）
+    """
+
+    DEFAULT_STRATEGIES = ('cdp_insert_text', 'native_value', 'contenteditable_range', 'keystrokes')
+
+    def __init__(self, driver, strategies=None):
+        """
+        Args:
+            driver: WebDriver 实例
+            strategies: 策略尝试顺序，默认为 DEFAULT_STRATEGIES
+        """
+        self.driver = driver
+        self.strategies = tuple(strategies or self.DEFAULT_STRATEGIES)
+        # 上一次成功的策略
+        self.preferred_strategy = None
+
+    def inject(self, element, text):
+        """向输入框注入文本
+
+        Args:
+            element: 输入框元素
+            text: 要输入的文本
+
+        Returns:
+            实际生效的策略名称
+
+        Raises:
+            RuntimeError: 所有策略均未能输入文本
+        """
+        strategies = list(self.strategies)
+        if self.preferred_strategy in strategies:
+            strategies.remove(self.preferred_strategy)
+            strategies.insert(0, self.preferred_strategy)
+
+        for strategy in strategies:
+            try:
+                applied = getattr(self, f'_inject_{strategy}')(element, text)
+            except Exception as e:
+                print(f"文本注入策略 {strategy} 出错: {str(e)}")
+                applied = False
+
+            if applied and self._verify(element, text):
+                self.preferred_strategy = strategy
+                return strategy
+
+            # 恢复空白输入框，再尝试下一种策略
+            self.driver.execute_script(_CLEAR_INPUT_JS, element)
+
+        raise RuntimeError("文本注入失败，所有输入策略均未生效")
+
+    def _verify(self, element, text):
+        """回读输入框内容，忽略空白差异后与期望文本比较"""
+        current = self.driver.execute_script(_READ_INPUT_JS, element) or ''
+        return _WHITESPACE_RE.sub('', current) == _WHITESPACE_RE.sub('', text)
+
+    def _inject_cdp_insert_text(self, element, text):
+        self.driver.execute_script(_FOCUS_INPUT_JS, element)
+        self.driver.execute_cdp_cmd('Input.insertText', {'text': text})
+        return True
+
+    def _inject_native_value(self, element, text):
+        return bool(self.driver.execute_script(_NATIVE_VALUE_JS, element, text))
+
+    def _inject_contenteditable_range(self, element, text):
+        return bool(self.driver.execute_script(_CONTENTEDITABLE_RANGE_JS, element, text))
+
+    def _inject_keystrokes(self, element, text):
+        self.driver.execute_script(_FOCUS_INPUT_JS, element)
+        ActionChains(self.driver).send_keys(text).perform()
+        return True
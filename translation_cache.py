@@ -0,0 +1,246 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """归一化待翻译文本：统一 Unicode 形式和换行符，去除首尾空白"""
+    text = unicodedata.normalize('NFC', text)
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.strip()
+
+
+def make_cache_key(engine, source_lang, target_lang, text):
+    """生成缓存键：翻译引擎 + 源语言 + 目标语言 + 归一化文本的哈希"""
+    text_hash = hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+    return f"{engine}|{source_lang}|{target_lang}|{text_hash}"
+
+
+class LRUCache:
+    """线程安全的有界内存 LRU 缓存"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """持久化到 SQLite 的缓存，按条目数量和过期时间淘汰
+
+    读取时只在内存中记录访问时间，积累 touch_batch 条或下一次写入时再一并写回，命中缓存时不需要提交事务；
+    条目数量在内存中计数，写入时无需扫描全表。
+    """
+
+    # 积累多少条访问时间后写回数据库
+    touch_batch = 256
+
+    def __init__(self, path, max_entries=100000, ttl=30 * 24 * 3600):
+        """
+        Args:
+            path: 数据库文件路径
+            max_entries: 最多保留的条目数，超出时淘汰最久未访问的条目
+            ttl: 条目有效期（秒），None 表示永不过期
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_accessed ON translations (accessed)")
+        self._conn.commit()
+        # 尚未写回的访问时间：key -> 最近一次访问时间
+        self._touched = {}
+        self._rows = 0
+        self.purge_expired()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT result, created FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            result, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                # 过期条目留给下一次写入覆盖或 purge_expired 删除，读取时不写数据库
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_batch:
+                self._flush_touched()
+                self._conn.commit()
+            return result
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._flush_touched()
+            exists = self._conn.execute("SELECT 1 FROM translations WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, result, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if not exists:
+                self._rows += 1
+            if self._rows > self.max_entries:
+                cursor = self._conn.execute(
+                    "DELETE FROM translations WHERE key IN "
+                    "(SELECT key FROM translations ORDER BY accessed LIMIT ?)",
+                    (self._rows - self.max_entries,)
+                )
+                self._rows -= cursor.rowcount
+            self._conn.commit()
+
+    def purge_expired(self):
+        """删除所有过期条目，并重新统计条目数量"""
+        with self._lock:
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.ttl,))
+                self._conn.commit()
+            self._rows = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM translations")
+            self._conn.commit()
+            self._rows = 0
+
+    def __len__(self):
+        return self._rows
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+    def _flush_touched(self):
+        """把积累的访问时间写回数据库，由调用方提交"""
+        if self._touched:
+            self._conn.executemany("UPDATE translations SET accessed = ? WHERE key = ?",
+                                   [(accessed, key) for key, accessed in self._touched.items()])
+            self._touched.clear()
+
+
+class TranslationCache:
+    """两级翻译缓存：内存 LRU + SQLite 持久化"""
+
+    def __init__(self, db_path=None, memory_entries=1024, disk_entries=100000, ttl=30 * 24 * 3600):
+        """
+        Args:
+            db_path: SQLite 数据库路径，None 表示只使用内存缓存
+            memory_entries: 内存缓存的最大条目数
+            disk_entries: 持久化缓存的最大条目数
+            ttl: 持久化条目的有效期（秒）
+        """
+        self.memory = LRUCache(memory_entries)
+        self.disk = SQLiteCache(db_path, disk_entries, ttl) if db_path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, engine, source_lang, target_lang, text):
+        """查询缓存，未命中时返回 None"""
+        key = make_cache_key(engine, source_lang, target_lang, text)
+        result = self.memory.get(key)
+        if result is not None:
+            self._count('memory_hits')
+            return result
+
+        if self.disk is not None:
+            result = self.disk.get(key)
+            if result is not None:
+                # 提升到内存缓存
+                self.memory.put(key, result)
+                self._count('disk_hits')
+                return result
+
+        self._count('misses')
+        return None
+
+    def put(self, engine, source_lang, target_lang, text, result):
+        key = make_cache_key(engine, source_lang, target_lang, text)
+        self.memory.put(key, result)
+        if self.disk is not None:
+            self.disk.put(key, result)
+
+    def translate(self, translator, text, source_lang='auto', target_lang='auto', **kwargs):
+        """带缓存的翻译：命中时直接返回，未命中时调用翻译器并写入缓存
+
+        Args:
+            translator: WebTranslator 或 TranslatorPool 实例
+            text: 要翻译的文本
+            source_lang: 源语言
+            target_lang: 目标语言
+            kwargs: 传递给 translator.translate 的其他参数
+
+        Returns:
+            翻译结果字符串或None
+        """
+        engine = getattr(translator, 'engine_name', type(translator).__name__)
+        result = self.get(engine, source_lang, target_lang, text)
+        if result is not None:
+            return result
+
+        result = translator.translate(text, **kwargs)
+        if result:
+            self.put(engine, source_lang, target_lang, text, result)
+        return result
+
+    def _count(self, name):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        """缓存命中统计"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            'memory_entries': len(self.memory),
+            'disk_entries': len(self.disk) if self.disk is not None else 0,
+        }
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
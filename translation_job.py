@@ -0,0 +1,63 @@
+import threading
+import time
+
+
+class JobAborted(Exception):
+    """翻译任务被中止"""
+
+
+class JobCancelled(JobAborted):
+    """翻译任务已取消"""
+
+
+class JobDeadlineExceeded(JobAborted, TimeoutError):
+    """翻译任务超过了截止时间"""
+
+
+class TranslationJob:
+    """带整体截止时间、可取消的翻译任务
+
+    翻译器在各阶段之间调用 check() 检查任务状态，并用 remaining() 限制每次等待的时长，
+    使整个翻译（包括排队、加载页面和等待结果）的耗时不超过截止时间。
+    取消是协作式的：正在执行的浏览器命令会先完成，随后在下一个检查点中止。
+    """
+
+    def __init__(self, timeout=None):
+        """
+        Args:
+            timeout: 整体超时时间（秒），None 表示不限时间
+        """
+        self.timeout = timeout
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self, limit=None):
+        """距截止时间的剩余秒数，不超过 limit；不限时间时返回 limit"""
+        if self.deadline is None:
+            return limit
+        left = max(0.0, self.deadline - time.monotonic())
+        return left if limit is None else min(limit, left)
+
+    def check(self, phase=None):
+        """任务已取消或超时时抛出异常
+
+        Raises:
+            JobCancelled: 任务已取消
+            JobDeadlineExceeded: 已超过截止时间
+        """
+        where = f"（{phase}）" if phase else ''
+        if self.cancelled:
+            raise JobCancelled(f"翻译任务已取消{where}")
+        if self.expired:
+            raise JobDeadlineExceeded(f"翻译任务超过截止时间 {self.timeout} 秒{where}")
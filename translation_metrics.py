@@ -0,0 +1,157 @@
+"""翻译各阶段的耗时统计
+
+WebTranslator 在浏览器启动和 translate() 的各个阶段（加载页面、清空输入、定位输入框、
+输入文本、等待结果、点击清除）记录耗时区间，附带引擎名称和文本长度，交给可插拔的输出端处理:
+
+    JsonLinesSink       每个区间写一行 JSON
+    HistogramRegistry   进程内按引擎和阶段汇总的直方图，可导出 Prometheus 文本格式
+
+用法示例:
+    recorder = MetricsRecorder([JsonLinesSink(path='./cache/spans.jsonl'), default_registry])
+    translator = BaiduTranslator(driver_path, metrics=recorder)
+"""
+import json
+import sys
+import threading
+import time
+
+# 直方图的默认分桶上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class TimingSpan:
+    """计时区间，作为上下文管理器使用，退出时把耗时交给记录器"""
+
+    def __init__(self, recorder, name, tags):
+        self.recorder = recorder
+        self.name = name
+        self.tags = tags
+        self.start = None
+        self.duration = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self.start
+        self.recorder.record(self.name, self.duration, self.tags, exc_type is not None)
+        return False
+
+
+class MetricsRecorder:
+    """把计时区间分发给各个输出端"""
+
+    def __init__(self, sinks=None):
+        self.sinks = list(sinks or [])
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    def span(self, name, **tags):
+        """创建计时区间
+
+        Args:
+            name: 阶段名称
+            tags: 附加标签，如 engine、text_length
+        """
+        return TimingSpan(self, name, tags)
+
+    def record(self, name, duration, tags=None, error=False):
+        event = {'span': name, 'duration': duration, 'error': error, 'time': time.time()}
+        event.update(tags or {})
+        for sink in self.sinks:
+            try:
+                sink.emit(event)
+            except Exception as e:
+                # 统计输出出错不能影响翻译
+                print(f"耗时统计输出失败: {str(e)}")
+
+
+class JsonLinesSink:
+    """每个计时区间输出一行 JSON"""
+
+    def __init__(self, stream=None, path=None):
+        """
+        Args:
+            stream: 输出流，默认为标准错误
+            path: 输出文件路径，指定时以追加方式写入文件
+        """
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+        self.stream = self._file or stream or sys.stderr
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        line = json.dumps(event, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class HistogramRegistry:
+    """按（阶段, 引擎, 是否出错）汇总的耗时直方图
+
+    文本长度不作为直方图标签，避免标签组合数量无限增长；需要时可从 JSON 日志中分析。
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def emit(self, event):
+        key = (event['span'], event.get('engine', ''), 'error' if event.get('error') else 'ok')
+        duration = event['duration']
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'count': 0, 'sum': 0.0}
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    series['counts'][i] += 1
+            series['count'] += 1
+            series['sum'] += duration
+
+    def snapshot(self):
+        """各序列的次数、总耗时和平均耗时（秒）"""
+        with self._lock:
+            return [
+                {'span': span, 'engine': engine, 'status': status, 'count': series['count'],
+                 'sum': series['sum'], 'mean': series['sum'] / series['count']}
+                for (span, engine, status), series in sorted(self._series.items())
+            ]
+
+    def prometheus_text(self, metric='pytranslator_phase_seconds'):
+        """导出 Prometheus 文本格式"""
+        lines = [f"# HELP {metric} Duration of WebTranslator phases in seconds.",
+                 f"# TYPE {metric} histogram"]
+        with self._lock:
+            for (span, engine, status), series in sorted(self._series.items()):
+                labels = f'phase="{_escape_label(span)}",engine="{_escape_label(engine)}",status="{status}"'
+                for bound, count in zip(self.buckets, series['counts']):
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {series["count"]}')
+                lines.append(f'{metric}_sum{{{labels}}} {series["sum"]}')
+                lines.append(f'{metric}_count{{{labels}}} {series["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# 默认的进程内直方图和记录器，未指定记录器的翻译器都使用它
+default_registry = HistogramRegistry()
+default_recorder = MetricsRecorder([default_registry])
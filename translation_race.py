@@ -0,0 +1,212 @@
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from translation_job import JobCancelled, TranslationJob
+
+
+def percentile(values, q):
+    """计算百分位数（最近秩法），values 为空时返回 None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class RaceStats:
+    """记录各引擎在竞速中的胜率和耗时分布"""
+
+    def __init__(self, history=1000):
+        self._lock = threading.Lock()
+        self._attempts = defaultdict(int)
+        self._wins = defaultdict(int)
+        self._errors = defaultdict(int)
+        self._latencies = defaultdict(lambda: deque(maxlen=history))
+
+    def record(self, engine, latency, error=False):
+        """记录一次参赛结果
+
+        Args:
+            engine: 引擎名称
+            latency: 本次翻译耗时（秒），None 表示落后后被取消、没有完成，只计入参赛次数
+            error: 是否出错或未返回结果
+        """
+        with self._lock:
+            self._attempts[engine] += 1
+            if error:
+                self._errors[engine] += 1
+            elif latency is not None:
+                self._latencies[engine].append(latency)
+
+    def record_win(self, engine):
+        with self._lock:
+            self._wins[engine] += 1
+
+    def snapshot(self):
+        """各引擎的胜率、出错次数和耗时百分位（秒）"""
+        with self._lock:
+            result = {}
+            for engine, attempts in self._attempts.items():
+                latencies = list(self._latencies[engine])
+                result[engine] = {
+                    'attempts': attempts,
+                    'wins': self._wins[engine],
+                    'win_rate': self._wins[engine] / attempts,
+                    'errors': self._errors[engine],
+                    'p50': percentile(latencies, 50),
+                    'p90': percentile(latencies, 90),
+                    'p99': percentile(latencies, 99),
+                }
+            return result
+
+
+class HedgedRace:
+    """多引擎对冲竞速翻译
+
+    同一段文本按顺序发给多个引擎，首个引擎立即开始，其余引擎每隔 hedge_delay 秒
+    依次加入（hedge_delay 为 0 时同时开始），采用最先返回的有效结果。
+    每个引擎使用独立的 TranslationJob，截止时间与调用方的任务一致；决出结果后取消落后引擎的任务，
+    尚未开始的直接放弃，已在执行的在下一个检查点中止，翻译器照常归还到池中复用。
+    """
+
+    # 调用方传入 job 时检查其是否已取消的间隔（秒）
+    cancel_poll_interval = 0.2
+
+    def __init__(self, pool_manager, translator_classes, hedge_delay=0.0, timeout=30, stats=None):
+        """
+        Args:
+            pool_manager: TranslatorPoolManager 实例，其 max_engines 不应小于参与竞速的引擎数量
+            translator_classes: 参与竞速的翻译器类，按优先级排序
+            hedge_delay: 相邻两个引擎的默认启动间隔（秒），可在每次调用时单独指定
+            timeout: 整体超时时间（秒）
+            stats: RaceStats 实例，None 时新建
+        """
+        self.pool_manager = pool_manager
+        self.translator_classes = list(translator_classes)
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.stats = stats or RaceStats()
+        self.engine_name = '+'.join(cls.__name__ for cls in self.translator_classes)
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.translator_classes) * max(1, pool_manager.pool_size))
+
+    @property
+    def max_text_length(self):
+        return min(cls.max_text_length for cls in self.translator_classes)
+
+    def translate(self, text, hedge_delay=None, **kwargs):
+        """竞速翻译，返回最先得到的有效结果
+
+        Args:
+            hedge_delay: 本次竞速的对冲间隔（秒），None 表示使用默认值
+
+        Raises:
+            TimeoutError: 超时仍没有引擎返回有效结果
+            RuntimeError: 所有引擎都失败
+        """
+        return self.race(text, hedge_delay, **kwargs)[1]
+
+    def race(self, text, hedge_delay=None, **kwargs):
+        """竞速翻译
+
+        Args:
+            text: 要翻译的文本
+            hedge_delay: 本次竞速的对冲间隔（秒），None 表示使用默认值
+            kwargs: 传递给各翻译器池 translate 的其他参数
+
+        Returns:
+            (获胜引擎名称, 翻译结果)
+        """
+        hedge_delay = self.hedge_delay if hedge_delay is None else hedge_delay
+        job = kwargs.get('job')
+        deadline = time.monotonic() + (job.remaining(self.timeout) if job else self.timeout)
+        pending = {}
+        contestants = []
+        errors = []
+        winner = None
+        launch_queue = list(self.translator_classes)
+
+        try:
+            while winner is None:
+                if job is not None:
+                    job.check('race')
+                if launch_queue:
+                    self._launch(launch_queue.pop(0), text, kwargs, pending, deadline, contestants)
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if not pending and not launch_queue:
+                    break
+
+                wait_time = remaining
+                if launch_queue:
+                    wait_time = min(remaining, hedge_delay)
+                if job is not None:
+                    wait_time = min(wait_time, self.cancel_poll_interval)
+                done, _ = wait(pending, timeout=wait_time, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    engine = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        errors.append(f"{engine}: {str(e)}")
+                        continue
+                    if result and winner is None:
+                        winner = (engine, result)
+                    elif not result:
+                        errors.append(f"{engine}: 未获取到结果")
+
+                # 当前所有任务都已失败时，不再等待对冲间隔，立即启动下一个引擎
+                while not pending and launch_queue and winner is None:
+                    self._launch(launch_queue.pop(0), text, kwargs, pending, deadline, contestants)
+        finally:
+            # 取消落后引擎：尚未开始的任务直接放弃，已在执行的在下一个检查点中止
+            for future in pending:
+                future.cancel()
+            for contestant in contestants:
+                contestant.cancel()
+
+        if winner is not None:
+            self.stats.record_win(winner[0])
+            return winner
+        if errors and not pending:
+            raise RuntimeError(f"所有引擎翻译失败: {'; '.join(errors)}")
+        if job is not None:
+            job.check('race')
+        raise TimeoutError(f"竞速翻译超时（{self.timeout} 秒）")
+
+    def _launch(self, translator_class, text, kwargs, pending, deadline, contestants):
+        engine = translator_class.__name__
+        pool = self.pool_manager.get_pool(translator_class)
+        contestant = TranslationJob(max(0.0, deadline - time.monotonic()))
+        contestants.append(contestant)
+        start = time.perf_counter()
+        future = self._executor.submit(pool.translate, text, **dict(kwargs, job=contestant))
+        pending[future] = engine
+        future.add_done_callback(lambda f: self._record(f, engine, start))
+
+    def _record(self, future, engine, start):
+        # 每个参赛引擎都计入参赛次数，落后后被取消（包括尚未开始）的不计入耗时
+        if future.cancelled():
+            self.stats.record(engine, None)
+            return
+        try:
+            error = not future.result()
+        except JobCancelled:
+            self.stats.record(engine, None)
+            return
+        except Exception:
+            error = True
+        self.stats.record(engine, time.perf_counter() - start, error)
+
+    def warm_up(self):
+        """预热所有参与竞速的引擎"""
+        for translator_class in self.translator_classes:
+            self.pool_manager.get_pool(translator_class).warm_up()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,379 @@
+"""本地 HTTP 翻译服务
+
+为本机的其他服务提供翻译接口，浏览器实例常驻并在请求之间复用。
+
+接口:
+    GET  /engines            可用的翻译引擎
+    GET  /health             服务状态，以及各引擎翻译器池和熔断器的状态
+    GET  /race-stats         竞速模式下各引擎的胜率和耗时百分位
+    GET  /metrics            翻译各阶段的耗时直方图（Prometheus 文本格式）
+    GET  /memory             各引擎翻译器的内存占用（浏览器常驻内存、页面 JS 堆、翻译次数）
+    POST /translate          {"text": "...", "engine": "baidu", "source_lang": "auto", "target_lang": "auto", "timeout": 30}
+    POST /translate/batch    {"texts": ["...", "..."], "engine": "baidu", ...}
+
+    engine 为引擎列表（如 ["baidu", "youdao"]）时使用竞速模式，可用 hedge_delay 指定对冲间隔（秒）。
+
+用法示例:
+    python translation_server.py --port 8765 --workers 2 --warm baidu,deepl
+    python translation_server.py --port 8765 --workers 2 --warm baidu,deepl --multi-tab
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from batch_translate import parse_proxy
+from text_chunker import translate_document
+from translation_cache import TranslationCache
+from translation_job import TranslationJob
+from translation_metrics import default_registry
+from memory_governor import MB, MemoryGovernor
+from translation_race import HedgedRace, RaceStats
+from translator_pool import TranslatorPoolManager
+from translator_supervisor import CircuitOpenError, TranslatorSupervisor
+from web_translator import TRANSLATORS
+
+
+class ServiceBusy(Exception):
+    """等待队列已满"""
+
+
+class BatchTooLarge(ValueError):
+    """一批任务的数量超过了等待队列的容量，重试也无法提交"""
+
+
+class TranslationService:
+    """翻译服务：有界等待队列 + 按引擎复用的翻译器池"""
+
+    def __init__(self, pool_manager, cache=None, workers=2, max_pending=64, default_timeout=30,
+                 default_engine='baidu', hedge_delay=0.5):
+        """
+        Args:
+            pool_manager: TranslatorPoolManager 实例
+            cache: TranslationCache 实例，None 表示不使用缓存
+            workers: 同时执行的翻译任务数量
+            max_pending: 执行中和排队中的任务总数上限，超出时拒绝新请求
+            default_timeout: 默认的单个请求超时时间（秒）
+            default_engine: 默认翻译引擎
+            hedge_delay: 竞速模式下默认的对冲间隔（秒）
+        """
+        self.pool_manager = pool_manager
+        self.cache = cache
+        self.default_timeout = default_timeout
+        self.default_engine = default_engine
+        self.max_pending = max_pending
+        self.hedge_delay = hedge_delay
+        self.race_stats = RaceStats()
+        self._races = {}
+        self._races_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def warm_up(self, engines):
+        """预先启动指定引擎的浏览器实例"""
+        for engine in engines:
+            self.pool_manager.get_pool(self._translator_class(engine)).warm_up()
+
+    def translate(self, text, engine=None, source_lang='auto', target_lang='auto', hedge_delay=None, job=None):
+        """同步翻译，供工作线程调用
+
+        Args:
+            job: TranslationJob 实例，超时或取消后不再继续翻译
+        """
+        translator = self._translator(engine)
+        options = {'hedge_delay': self._hedge_delay(hedge_delay)} if isinstance(translator, HedgedRace) else {}
+        job = job or TranslationJob()
+
+        def translate_chunk(chunk):
+            job.check()
+            if self.cache is None:
+                return translator.translate(chunk, job=job, **options)
+            return self.cache.translate(translator, chunk, source_lang, target_lang, job=job, **options)
+
+        return translate_document(translate_chunk, text, translator.max_text_length, 1)
+
+    def submit(self, texts, engine=None, source_lang='auto', target_lang='auto', hedge_delay=None, timeout=None):
+        """提交一批翻译任务
+
+        Args:
+            timeout: 整体超时时间（秒），从提交时开始计算（包括排队时间），超时后任务停止翻译；
+                None 表示使用 default_timeout
+
+        Returns:
+            与 texts 一一对应的 Future 列表
+
+        Raises:
+            ServiceBusy: 等待队列暂时容纳不下这批任务
+            BatchTooLarge: 任务数量超过 max_pending
+            ValueError: 未知的翻译引擎，或 hedge_delay 不是非负数
+        """
+        self._translator(engine)
+        self._hedge_delay(hedge_delay)
+        if len(texts) > self.max_pending:
+            raise BatchTooLarge(f"一次最多提交 {self.max_pending} 条文本，实际 {len(texts)} 条")
+        acquired = 0
+        for _ in texts:
+            if not self._slots.acquire(blocking=False):
+                for _ in range(acquired):
+                    self._slots.release()
+                raise ServiceBusy(f"翻译队列已满（{self.max_pending}）")
+            acquired += 1
+
+        futures = []
+        timeout = self.default_timeout if timeout is None else timeout
+        for text in texts:
+            with self._pending_lock:
+                self._pending += 1
+            future = self._executor.submit(self.translate, text, engine, source_lang, target_lang, hedge_delay,
+                                           TranslationJob(timeout))
+            future.add_done_callback(self._release_slot)
+            futures.append(future)
+        return futures
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for race in self._races.values():
+            race.close()
+        self.pool_manager.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def _release_slot(self, _future):
+        with self._pending_lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _translator(self, engine):
+        """单个引擎返回其翻译器池，引擎列表返回竞速翻译器
+
+        竞速翻译器按引擎组合缓存，对冲间隔在每次调用时传入，客户端指定的间隔不会产生新的实例。
+        """
+        if not isinstance(engine, list):
+            return self.pool_manager.get_pool(self._translator_class(engine))
+
+        # 重复的引擎只参加一次
+        classes = tuple(dict.fromkeys(self._translator_class(name) for name in engine))
+        if not classes:
+            raise ValueError("竞速模式至少需要一个翻译引擎")
+        with self._races_lock:
+            race = self._races.get(classes)
+            if race is None:
+                race = HedgedRace(self.pool_manager, classes, self.hedge_delay, self.default_timeout, self.race_stats)
+                self._races[classes] = race
+            return race
+
+    def _hedge_delay(self, hedge_delay):
+        """解析竞速模式的对冲间隔（秒），None 时使用默认值
+
+        Raises:
+            ValueError: 不是有限的非负数
+        """
+        if hedge_delay is None:
+            return self.hedge_delay
+        try:
+            value = float(hedge_delay)
+        except (TypeError, ValueError):
+            value = None
+        if value is None or not math.isfinite(value) or value < 0:
+            raise ValueError(f"hedge_delay 必须是非负数: {hedge_delay!r}")
+        return value
+
+    def _translator_class(self, engine):
+        if engine is None or engine == '':
+            engine = self.default_engine
+        if not isinstance(engine, str) or engine not in TRANSLATORS:
+            raise ValueError(f"未知的翻译引擎: {engine!r}")
+        return TRANSLATORS[engine]
+
+
+class TranslationRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 默认保持连接，客户端可以在同一连接上连续发送请求
+    protocol_version = 'HTTP/1.1'
+    # 空闲连接的超时时间（秒）
+    timeout = 60
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def do_GET(self):
+        if self.path == '/engines':
+            self._send_json(200, {'engines': sorted(TRANSLATORS), 'default': self.service.default_engine})
+        elif self.path == '/race-stats':
+            self._send_json(200, self.service.race_stats.snapshot())
+        elif self.path == '/metrics':
+            self._send_text(200, default_registry.prometheus_text(), 'text/plain; version=0.0.4; charset=utf-8')
+        elif self.path == '/memory':
+            self._send_json(200, self.service.pool_manager.memory_usage())
+        elif self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'pending': self.service.pending,
+                                  'max_pending': self.service.max_pending,
+                                  'engines': self.service.pool_manager.health()})
+        else:
+            self._send_json(404, {'error': f"未知的路径: {self.path}"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            # 无法确定请求体的结束位置，不能再在这个连接上读取下一个请求
+            self._send_json(400, {'error': "Content-Length 无效"}, {'Connection': 'close'})
+            return
+        # 先读完请求体，保持连接时剩余的请求体才不会被当作下一个请求
+        data = self.rfile.read(length)
+        if self.path not in ('/translate', '/translate/batch'):
+            self._send_json(404, {'error': f"未知的路径: {self.path}"})
+            return
+
+        try:
+            body = json.loads(data or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': "请求体不是有效的 JSON"})
+            return
+        if not isinstance(body, dict):
+            self._send_json(400, {'error': "请求体必须是 JSON 对象"})
+            return
+
+        batch = self.path == '/translate/batch'
+        texts = body.get('texts') if batch else [body.get('text')]
+        if not isinstance(texts, list) or not texts or not all(isinstance(t, str) for t in texts):
+            self._send_json(400, {'error': "缺少待翻译文本"})
+            return
+
+        engine = body.get('engine')
+        source_lang, target_lang = body.get('source_lang', 'auto'), body.get('target_lang', 'auto')
+        if not isinstance(source_lang, str) or not isinstance(target_lang, str):
+            self._send_json(400, {'error': "source_lang 和 target_lang 必须是字符串"})
+            return
+        try:
+            timeout = float(body.get('timeout') or self.service.default_timeout)
+        except (TypeError, ValueError):
+            timeout = None
+        if timeout is None or not math.isfinite(timeout) or timeout <= 0:
+            self._send_json(400, {'error': f"timeout 必须是正数: {body.get('timeout')!r}"})
+            return
+
+        start = time.perf_counter()
+        try:
+            futures = self.service.submit(texts, engine, source_lang, target_lang, body.get('hedge_delay'), timeout)
+        except ServiceBusy as e:
+            self._send_json(503, {'error': str(e)}, {'Retry-After': '1'})
+            return
+        except BatchTooLarge as e:
+            self._send_json(413, {'error': str(e)})
+            return
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        deadline = start + timeout
+        results = []
+        for future in futures:
+            try:
+                results.append({'translation': future.result(timeout=max(0.0, deadline - time.perf_counter()))})
+            except (FutureTimeoutError, TimeoutError):
+                results.append({'error': f"翻译超时（{timeout} 秒）", 'timeout': True})
+            except CircuitOpenError as e:
+                results.append({'error': str(e), 'unavailable': True})
+            except Exception as e:
+                results.append({'error': str(e)})
+
+        elapsed = time.perf_counter() - start
+        if batch:
+            self._send_json(200, {'results': results, 'elapsed': elapsed})
+        elif 'translation' in results[0]:
+            self._send_json(200, dict(results[0], elapsed=elapsed))
+        elif results[0].get('unavailable'):
+            self._send_json(503, dict(results[0], elapsed=elapsed), {'Retry-After': '5'})
+        else:
+            self._send_json(504 if results[0].get('timeout') else 502, dict(results[0], elapsed=elapsed))
+
+    def _send_json(self, status, payload, headers=None):
+        self._send_text(status, json.dumps(payload, ensure_ascii=False), 'application/json; charset=utf-8', headers)
+
+    def _send_text(self, status, text, content_type, headers=None):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TranslationServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, TranslationRequestHandler)
+        self.service = service
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='PyTranslator 本地 HTTP 翻译服务')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口')
+    parser.add_argument('-w', '--workers', type=int, default=2, help='每个翻译引擎的浏览器实例数量')
+    parser.add_argument('--multi-tab', action='store_true', help='所有翻译器共用一个浏览器进程，每个翻译器占用一个标签页')
+    parser.add_argument('--max-pending', type=int, default=64, help='执行中和排队中的请求数上限')
+    parser.add_argument('--timeout', type=float, default=30, help='默认的请求超时时间（秒）')
+    parser.add_argument('--engine', default='baidu', choices=sorted(TRANSLATORS), help='默认翻译引擎')
+    parser.add_argument('--hedge-delay', type=float, default=0.5, help='竞速模式下默认的对冲间隔（秒）')
+    parser.add_argument('--warm', default='', help='启动时预热的引擎，逗号分隔，如 baidu,deepl')
+    parser.add_argument('--driver-path', default='./browser_driver/msedgedriver.exe', help='浏览器驱动路径')
+    parser.add_argument('--proxy', help='代理地址，如 http://127.0.0.1:7890')
+    parser.add_argument('--cache', default='./cache/translation_cache.db', help='翻译缓存数据库路径')
+    parser.add_argument('--no-cache', action='store_true', help='不使用持久化翻译缓存')
+    parser.add_argument('--max-rss-mb', type=float, default=1536, help='单个浏览器的常驻内存上限（MB），超出时空闲时重启')
+    parser.add_argument('--max-js-heap-mb', type=float, default=256, help='翻译页面的 JS 堆上限（MB），超出时空闲时回收页面')
+    parser.add_argument('--max-page-translations', type=int, default=500, help='页面加载一次后最多翻译的次数，超出时回收页面')
+    parser.add_argument('--check-interval', type=float, default=30, help='浏览器健康和内存检查的间隔（秒）')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    driver_path = os.path.abspath(args.driver_path)
+    if not os.path.exists(driver_path):
+        print(f"浏览器驱动文件不存在: {driver_path}", file=sys.stderr)
+        return 1
+
+    pool_manager = TranslatorPoolManager(driver_path, args.workers, is_headless=True,
+                                         proxy_config=parse_proxy(args.proxy), multi_tab=args.multi_tab)
+    cache = TranslationCache(None if args.no_cache else args.cache)
+    # 每个引擎最多 workers 个浏览器，执行线程数按引擎数量放大，避免不同引擎互相阻塞
+    service = TranslationService(pool_manager, cache, args.workers * len(TRANSLATORS), args.max_pending,
+                                 args.timeout, args.engine, args.hedge_delay)
+    server = TranslationServer((args.host, args.port), service)
+    governor = MemoryGovernor(args.max_rss_mb * MB, args.max_js_heap_mb * MB, args.max_page_translations)
+    supervisor = TranslatorSupervisor(pool_manager, args.check_interval, governor).start()
+    try:
+        service.warm_up([engine for engine in args.warm.split(',') if engine])
+        print(f"翻译服务已启动: http://{args.host}:{args.port}")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        supervisor.stop()
+        service.close()
+        print("翻译服务已关闭")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
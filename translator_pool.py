@@ -0,0 +1,400 @@
+import functools
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from translation_job import JobAborted, JobDeadlineExceeded
+from translator_supervisor import CircuitBreaker, heartbeat
+
+
+class TranslatorPool:
+    """同一翻译引擎的翻译器池
+
+    池中最多保留 size 个已启动的翻译器实例，工作线程通过先进先出的队列公平地借用和归还；
+    翻译出错的实例会被关闭并在后台重新创建。浏览器已崩溃或卡死导致的失败会换一个实例重试一次；
+    连续失败过多时熔断，之后的翻译立即失败，直到熔断到期。
+    """
+
+    def __init__(self, factory, size=2, engine_name=None, max_text_length=5000, breaker=None,
+                 heartbeat_timeout=5):
+        """
+        Args:
+            factory: 无参可调用对象，返回一个新的 WebTranslator 实例
+            size: 池中翻译器实例的数量
+            engine_name: 翻译引擎名称，用于缓存键和日志
+            max_text_length: 翻译引擎单次允许的最大文本长度
+            breaker: 该引擎的熔断器（CircuitBreaker），默认连续失败 3 次熔断 30 秒
+            heartbeat_timeout: 心跳检查的超时时间（秒）
+        """
+        self.factory = factory
+        self.size = size
+        self.engine_name = engine_name or getattr(factory, '__name__', 'translator')
+        self.max_text_length = max_text_length
+        self.breaker = breaker or CircuitBreaker(name=self.engine_name)
+        self.heartbeat_timeout = heartbeat_timeout
+        self._idle = queue.Queue()
+        self._created = 0
+        # 各翻译器最近一次空闲检查时的内存占用
+        self._memory = {}
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        """并发启动所有尚未创建的翻译器实例，阻塞直到全部启动完成
+
+        Raises:
+            Exception: 有实例启动失败时抛出第一个错误
+        """
+        missing = 0
+        while self._reserve():
+            missing += 1
+        if not missing:
+            return
+
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            futures = [executor.submit(self._create) for _ in range(missing)]
+        errors = []
+        for future in futures:
+            if future.exception():
+                errors.append(future.exception())
+            else:
+                self.release(future.result())
+        if errors:
+            raise errors[0]
+
+    def acquire(self, timeout=None):
+        """借出一个翻译器，池未满时按需创建，否则排队等待
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Raises:
+            queue.Empty: 超时仍没有可用的翻译器
+            RuntimeError: 池已关闭
+        """
+        while True:
+            if self._closed:
+                # 唤醒下一个等待者，使其同样退出
+                self._idle.put(None)
+                raise RuntimeError(f"{self.engine_name} 翻译器池已关闭")
+
+            try:
+                translator = self._idle.get_nowait()
+            except queue.Empty:
+                if self._reserve():
+                    return self._create()
+                translator = self._idle.get(timeout=timeout)
+
+            # None 表示有实例创建失败、空出了名额，重新尝试创建
+            if translator is not None:
+                return translator
+
+    def release(self, translator, broken=False):
+        """归还翻译器
+
+        Args:
+            translator: 借出的翻译器
+            broken: 翻译器是否出错，出错的实例会被关闭并在后台替换
+        """
+        if self._closed:
+            self._quit(translator)
+            return
+
+        if not broken:
+            self._idle.put(translator)
+            return
+
+        # 卡死的浏览器关闭得很慢，在后台关闭并替换，不阻塞归还者
+        threading.Thread(target=self._replace, args=(translator,), daemon=True).start()
+
+    def translate(self, text, **kwargs):
+        """借用一个翻译器执行翻译，完成后归还
+
+        Args:
+            text: 要翻译的文本
+            kwargs: 传递给 translator.translate 的其他参数，其中 job（TranslationJob）
+                同时限制等待空闲翻译器的时间
+
+        Returns:
+            翻译结果字符串或None
+
+        Raises:
+            CircuitOpenError: 该引擎已熔断
+        """
+        self.breaker.allow()
+        job = kwargs.get('job')
+        retried = False
+        while True:
+            try:
+                translator = self.acquire(job.remaining() if job else None)
+            except queue.Empty:
+                self.breaker.record_ignored()
+                raise JobDeadlineExceeded(f"等待空闲的 {self.engine_name} 翻译器超时")
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            try:
+                result = translator.translate(text, **kwargs)
+            except JobAborted:
+                # 任务被取消或超时，翻译器已自行清理页面，可以继续使用
+                self.release(translator)
+                self.breaker.record_ignored()
+                raise
+            except Exception:
+                alive = heartbeat(translator, self.heartbeat_timeout)
+                self.release(translator, broken=True)
+                if alive or retried:
+                    self.breaker.record_failure()
+                    raise
+                # 浏览器已崩溃或卡死，换一个实例重试一次
+                print(f"{self.engine_name} 浏览器无响应，重启后重试")
+                retried = True
+                continue
+            self.release(translator)
+            self.breaker.record_success()
+            return result
+
+    def check_idle(self, governor=None):
+        """对当前空闲的翻译器逐个做心跳检查，替换已崩溃或卡死的实例
+
+        Args:
+            governor: MemoryGovernor 实例，指定时同时检查内存占用，按需回收页面或重启浏览器
+
+        Returns:
+            被替换的翻译器数量
+        """
+        replaced = 0
+        for _ in range(self._idle.qsize()):
+            try:
+                translator = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if translator is None:
+                self._idle.put(None)
+                continue
+            if not heartbeat(translator, self.heartbeat_timeout):
+                print(f"{self.engine_name} 浏览器无响应，正在重启")
+                self.release(translator, broken=True)
+                replaced += 1
+            elif governor is not None and not self._govern(translator, governor):
+                replaced += 1
+        return replaced
+
+    def _govern(self, translator, governor):
+        """检查空闲翻译器的内存占用，按需回收页面或重启浏览器后归还
+
+        Returns:
+            翻译器是否保留（False 表示已关闭并在后台替换）
+        """
+        try:
+            usage, action = governor.inspect(translator)
+            if usage is not None:
+                self._memory[translator] = usage
+            if action == governor.RESTART_BROWSER:
+                print(f"{self.engine_name} 浏览器内存占用 {usage['rss'] // (1024 * 1024)} MB 超过上限，正在重启")
+                self.release(translator, broken=True)
+                return False
+            if action == governor.RECYCLE_PAGE:
+                print(f"{self.engine_name} 回收翻译页面（JS 堆 {(usage['js_heap_used'] or 0) // (1024 * 1024)} MB，"
+                      f"已翻译 {usage['page_translations']} 次）")
+                translator.recycle_page()
+        except Exception as e:
+            print(f"{self.engine_name} 内存检查失败: {str(e)}")
+            self.release(translator, broken=True)
+            return False
+        self.release(translator)
+        return True
+
+    def memory_usage(self):
+        """各翻译器最近一次空闲检查时的内存占用"""
+        return list(self._memory.values())
+
+    def health(self):
+        """池的状态：实例数量、空闲数量和熔断器状态"""
+        return {'size': self.size, 'created': self._created, 'idle': self._idle.qsize(),
+                'breaker': self.breaker.snapshot()}
+
+    def close(self):
+        """关闭池中所有空闲的翻译器，借出中的实例在归还时关闭"""
+        self._closed = True
+        while True:
+            try:
+                translator = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if translator is not None:
+                self._quit(translator)
+        # 唤醒正在等待的借用者
+        self._idle.put(None)
+
+    def _reserve(self):
+        """占用一个实例名额，池已满时返回 False"""
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def _create(self):
+        """在已占用的名额上创建实例，失败时释放名额并唤醒一个等待者"""
+        try:
+            return self.factory()
+        except Exception as e:
+            with self._lock:
+                self._created -= 1
+            self._idle.put(None)
+            print(f"{self.engine_name} 翻译器创建失败: {str(e)}")
+            raise
+
+    def _replace(self, translator):
+        """关闭出错的实例，并在空出的名额上创建新实例"""
+        self._quit(translator)
+        if self._reserve():
+            self._spawn()
+
+    def _spawn(self):
+        """在后台创建实例并放入空闲队列"""
+        try:
+            translator = self._create()
+        except Exception:
+            return
+        self.release(translator)
+
+    def _quit(self, translator):
+        with self._lock:
+            self._created -= 1
+        self._memory.pop(translator, None)
+        try:
+            translator.quit()
+        except Exception as e:
+            print(f"{self.engine_name} 翻译器关闭失败: {str(e)}")
+
+
+class TranslatorPoolManager:
+    """按翻译引擎管理翻译器池
+
+    最近使用的 max_engines 个引擎的池保持预热，切换到这些引擎无需重新启动浏览器；
+    超出数量时最久未使用的池被淘汰，其中的浏览器全部关闭。
+    多标签页模式下所有引擎的翻译器都是同一个共享浏览器中的标签页。
+    """
+
+    def __init__(self, driver_path, pool_size=2, is_headless=True, proxy_config=None, max_engines=None,
+                 failure_threshold=3, reset_timeout=30, multi_tab=False, **translator_kwargs):
+        """
+        Args:
+            driver_path: 浏览器驱动路径
+            pool_size: 每个翻译引擎的翻译器实例数量
+            is_headless: 是否使用无头模式
+            proxy_config: 代理配置
+            max_engines: 同时保持预热的引擎数量上限，None 表示不限制
+            failure_threshold: 引擎熔断的连续失败次数
+            reset_timeout: 引擎熔断的持续时间（秒）
+            multi_tab: 是否使用多标签页模式，只启动一个浏览器进程，每个翻译器占用其中一个标签页
+            translator_kwargs: 传递给翻译器构造函数的其他参数
+        """
+        self.driver_path = driver_path
+        self.pool_size = pool_size
+        self.is_headless = is_headless
+        self.proxy_config = proxy_config
+        self.max_engines = max_engines
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.multi_tab = multi_tab
+        self.translator_kwargs = translator_kwargs
+        self._pools = OrderedDict()
+        self._lock = threading.Lock()
+        self._browser_host = None
+        self._host_lock = threading.Lock()
+
+    def get_pool(self, translator_class):
+        """获取（必要时创建）某个翻译器类的池，并标记为最近使用"""
+        with self._lock:
+            pool = self._pools.get(translator_class)
+            if pool is None:
+                factory = functools.partial(translator_class, self.driver_path, is_headless=self.is_headless,
+                                            proxy_config=self.proxy_config, **self.translator_kwargs)
+                if self.multi_tab and getattr(translator_class, 'supports_browser_host', False):
+                    factory = functools.partial(self._create_tab_translator, factory)
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout, translator_class.__name__)
+                pool = TranslatorPool(factory, self.pool_size, translator_class.__name__,
+                                      translator_class.max_text_length, breaker)
+                self._pools[translator_class] = pool
+            self._pools.move_to_end(translator_class)
+
+            evicted = []
+            while self.max_engines and len(self._pools) > self.max_engines:
+                evicted.append(self._pools.popitem(last=False)[1])
+
+        for old_pool in evicted:
+            print(f"关闭最久未使用的 {old_pool.engine_name} 翻译器")
+            old_pool.close()
+        return pool
+
+    def prewarm(self, translator_class):
+        """在后台线程中预热某个引擎的池，立即返回该池
+
+        池中的实例启动完成前，借用会排队等待，不会重复启动浏览器。
+        """
+        pool = self.get_pool(translator_class)
+
+        def warm_up():
+            try:
+                pool.warm_up()
+            except Exception as e:
+                print(f"{pool.engine_name} 翻译器预热失败: {str(e)}")
+
+        threading.Thread(target=warm_up, daemon=True).start()
+        return pool
+
+    def engines(self):
+        """当前保持预热的引擎，按最近使用排序"""
+        with self._lock:
+            return [pool.engine_name for pool in reversed(self._pools.values())]
+
+    def pools(self):
+        """当前所有的翻译器池"""
+        with self._lock:
+            return list(self._pools.values())
+
+    def health(self):
+        """各引擎翻译器池的状态"""
+        return {pool.engine_name: pool.health() for pool in self.pools()}
+
+    def memory_usage(self):
+        """各引擎翻译器的内存占用（最近一次空闲检查时的数据）"""
+        return {pool.engine_name: pool.memory_usage() for pool in self.pools()}
+
+    def translate(self, translator_class, text, **kwargs):
+        return self.get_pool(translator_class).translate(text, **kwargs)
+
+    def browser_host(self):
+        """多标签页模式下共享的浏览器，首次使用时创建"""
+        with self._host_lock:
+            if self._browser_host is None:
+                # 延迟导入，未使用多标签页模式时不加载 selenium
+                from browser_host import BrowserHost
+                self._browser_host = BrowserHost(self.driver_path, self.is_headless, self.proxy_config)
+            return self._browser_host
+
+    def _create_tab_translator(self, factory):
+        return factory(browser_host=self.browser_host())
+
+    def set_proxy_config(self, proxy_config):
+        """更新代理配置，配置变化时关闭现有的池，之后按新配置重新创建"""
+        if proxy_config == self.proxy_config:
+            return
+        self.proxy_config = proxy_config
+        self.close()
+
+    def close(self):
+        """关闭所有翻译器池"""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
+        with self._host_lock:
+            host, self._browser_host = self._browser_host, None
+        if host is not None:
+            host.quit()
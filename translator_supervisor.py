@@ -0,0 +1,159 @@
+"""翻译器健康监控
+
+- heartbeat: 在后台线程中检查浏览器是否仍在响应，超时视为卡死
+- CircuitBreaker: 按引擎统计连续失败，失败过多时熔断，调用方立即失败而不是逐个等待超时
+- TranslatorSupervisor: 定期对各翻译器池中空闲的翻译器做心跳检查，替换已崩溃或卡死的浏览器，
+  并可按 memory_governor.MemoryGovernor 的规则回收页面或重启内存占用过高的浏览器
+"""
+import threading
+import time
+
+
+class CircuitOpenError(RuntimeError):
+    """翻译引擎已熔断，暂时不接受翻译请求"""
+
+
+def heartbeat(translator, timeout=5):
+    """检查翻译器的浏览器是否仍在响应
+
+    在后台线程中调用 translator.ping()，出错或超过 timeout 秒仍未返回都视为浏览器已崩溃或卡死。
+    没有 ping 方法的翻译器（如不常驻浏览器的 HTTP 后端）总是视为正常。
+
+    Args:
+        translator: 翻译器实例
+        timeout: 最长等待时间（秒）
+
+    Returns:
+        浏览器是否正常
+    """
+    ping = getattr(translator, 'ping', None)
+    if ping is None:
+        return True
+
+    result = {}
+
+    def run():
+        try:
+            result['alive'] = bool(ping())
+        except Exception:
+            result['alive'] = False
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return result.get('alive', False)
+
+
+class CircuitBreaker:
+    """单个翻译引擎的熔断器
+
+    连续失败 failure_threshold 次后熔断（open），之后 reset_timeout 秒内的调用立即失败；
+    到期后进入半开状态（half_open），只放行一次试探调用：成功则恢复，失败则重新熔断。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, reset_timeout=30, name=None):
+        """
+        Args:
+            failure_threshold: 触发熔断的连续失败次数
+            reset_timeout: 熔断持续时间（秒），到期后放行一次试探调用
+            name: 引擎名称，用于错误信息
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name or 'translator'
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """调用前检查是否放行
+
+        Raises:
+            CircuitOpenError: 引擎已熔断，或半开状态下已有试探调用在进行
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN:
+                retry_after = self._opened_at + self.reset_timeout - time.monotonic()
+                if retry_after > 0:
+                    raise CircuitOpenError(f"{self.name} 连续失败 {self.failures} 次，已暂停使用，"
+                                           f"{retry_after:.0f} 秒后重试")
+                self.state = self.HALF_OPEN
+            if self._trial_running:
+                raise CircuitOpenError(f"{self.name} 正在恢复中，请稍后重试")
+            self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"{self.name} 连续失败 {self.failures} 次，暂停使用 {self.reset_timeout} 秒")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_ignored(self):
+        """调用既未成功也不算失败（如任务被取消），半开状态下允许下一次试探"""
+        with self._lock:
+            self._trial_running = False
+
+    def snapshot(self):
+        with self._lock:
+            retry_after = 0.0
+            if self.state == self.OPEN:
+                retry_after = max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+            return {'state': self.state, 'failures': self.failures, 'retry_after': retry_after}
+
+
+class TranslatorSupervisor:
+    """定期检查 TranslatorPoolManager 中各池的空闲翻译器，替换已崩溃或卡死的浏览器"""
+
+    def __init__(self, pool_manager, interval=30, governor=None):
+        """
+        Args:
+            pool_manager: TranslatorPoolManager 实例
+            interval: 检查间隔（秒）
+            governor: MemoryGovernor 实例，None 表示不检查内存占用
+        """
+        self.pool_manager = pool_manager
+        self.interval = interval
+        self.governor = governor
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def check_once(self):
+        """检查一遍所有池，返回被替换的翻译器数量"""
+        replaced = 0
+        for pool in self.pool_manager.pools():
+            try:
+                replaced += pool.check_idle(self.governor)
+            except Exception as e:
+                print(f"{pool.engine_name} 翻译器健康检查失败: {str(e)}")
+        return replaced
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check_once()
@@ -1,23 +1,125 @@
+import base64
+import json
+import re
 import time
+from collections import deque
+from statistics import median
 from typing import Dict, Any
 
 from selenium import webdriver
-from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.edge.service import Service
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 
+from browser_host import build_edge_options, load_url
+from http_translator import AliHttpTranslator
+from memory_governor import process_tree_rss
+from text_injector import TextInjector
+from translation_job import TranslationJob, JobAborted
+from translation_metrics import default_recorder
+
+# 默认屏蔽的资源类别及对应的 URL 模式（CDP Network.setBlockedURLs 通配符）
+BLOCKED_RESOURCES = {
+    'image': ['*.png', '*.png?*', '*.jpg', '*.jpg?*', '*.jpeg', '*.jpeg?*', '*.gif', '*.gif?*',
+              '*.webp', '*.webp?*', '*.ico', '*.bmp', '*.avif'],
+    'font': ['*.woff', '*.woff?*', '*.woff2', '*.woff2?*', '*.ttf', '*.otf', '*.eot'],
+    'media': ['*.mp4', '*.webm', '*.mp3', '*.ogg', '*.m4a', '*.wav'],
+    'analytics': ['*google-analytics.com/*', '*googletagmanager.com/*', '*doubleclick.net/*',
+                  '*googlesyndication.com/*', '*hm.baidu.com/*', '*cnzz.com/*', '*umeng.com/*',
+                  '*aplus*.alicdn.com/*', '*arms-retcode*', '*sentry.io/*', '*sentry-cdn.com/*',
+                  '*clarity.ms/*', '*hotjar.com/*'],
+}
+
+# 统计页面加载的传输字节数和耗时
+_LOAD_STATS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0;
+for (const entry of resources) {
+    bytes += entry.transferSize;
+}
+return {bytes: bytes, requests: resources.length + 1, load_ms: nav ? nav.loadEventEnd - nav.startTime : null};
+"""
+
+# 在页面中安装 MutationObserver，记录输出元素文本最后一次变化的时间
+_INSTALL_RESULT_OBSERVER_JS = """
+const selector = arguments[0];
+const read = () => {
+    const el = document.querySelector(selector);
+    return el ? el.innerText.trim() : '';
+};
+if (window.__pytResultObserver) {
+    window.__pytResultObserver.disconnect();
+}
+const initial = read();
+const state = {text: initial, initial: initial, changes: 0, startedAt: performance.now(), changedAt: performance.now()};
+const observer = new MutationObserver(() => {
+    const text = read();
+    if (text !== state.text) {
+        state.text = text;
+        state.changes += 1;
+        state.changedAt = performance.now();
+    }
+});
+observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+window.__pytResultObserver = observer;
+window.__pytResultState = state;
+"""
+
+# 读取观察器记录的输出状态
+_POLL_RESULT_OBSERVER_JS = """
+const state = window.__pytResultState;
+if (!state) return null;
+const now = performance.now();
+return {text: state.text, initial: state.initial, changes: state.changes, quiet: now - state.changedAt,
+        elapsed: now - state.startedAt};
+"""
+
+# 卸载观察器
+_REMOVE_RESULT_OBSERVER_JS = """
+if (window.__pytResultObserver) {
+    window.__pytResultObserver.disconnect();
+}
+window.__pytResultObserver = null;
+window.__pytResultState = null;
+"""
+
 
 class WebTranslator:
-    def __init__(self, url, input_csspath, output_csspath, clear_csspath, trans_result_wait=1,
+    # 文本注入策略的尝试顺序，None 表示使用 TextInjector 的默认顺序
+    inject_strategies = None
+    # 单次翻译允许的最大文本长度，更长的文本需要分段翻译
+    max_text_length = 5000
+    # 翻译页面依赖、不能屏蔽的资源类别（BLOCKED_RESOURCES 的键）
+    resource_allowlist = ()
+    # 是否默认屏蔽资源：resource_allowlist 经 benchmark.py --resource-savings 在真实页面上确认翻译正常后才设为 True
+    block_resources_by_default = False
+    # 翻译接口的 URL 正则，None 表示该引擎不支持从网络层读取结果
+    result_api_pattern = None
+    # 是否可以作为共享浏览器（BrowserHost）中的一个标签页运行
+    supports_browser_host = True
+
+    def __init__(self, url, input_csspath, output_csspath, clear_csspath, result_quiet=0.3,
                  driver_path='./browser_driver/msedgedriver.exe', is_headless=True,
-                 proxy_config: Dict[str, Any] = None):
+                 proxy_config: Dict[str, Any] = None, session_mode=True, session_ttl=600,
+                 block_resources=None, capture_mode='dom', metrics=None, browser_host=None):
         """初始化翻译器
 
         Args:
+            result_quiet: 翻译结果保持不变多久（秒）后视为翻译完成
             driver_path: 浏览器驱动路径
             is_headless: 是否使用无头模式
+            session_mode: 是否复用已加载的翻译页面（会话模式），关闭时每次翻译都重新加载页面
+            session_ttl: 会话页面的最长复用时间（秒），超时后视为过期并重新加载
+            block_resources: 是否屏蔽翻译用不到的图片、字体、音视频和统计脚本，None 表示使用引擎的
+                block_resources_by_default
+            capture_mode: 翻译结果的读取方式，'dom' 读取页面元素；'network' 优先通过 CDP
+                从翻译接口的响应中解析结果，页面元素作为兜底
+            metrics: 各阶段耗时的记录器（translation_metrics.MetricsRecorder），默认使用进程内直方图
+            browser_host: 共享浏览器（browser_host.BrowserHost），指定时在其中打开一个标签页，
+                不再单独启动浏览器，is_headless 和 proxy_config 以共享浏览器的设置为准
         """
         self.driver = None
         self.driver_path = driver_path
@@ -25,23 +127,39 @@ class WebTranslator:
         self.input_csspath = input_csspath
         self.output_csspath = output_csspath
         self.clear_csspath = clear_csspath
-        self.trans_result_wait = trans_result_wait
-
-        options = webdriver.EdgeOptions()
-        if is_headless:
-            options.add_argument('--headless')  # 不显示浏览器
-        options.add_argument("--disable-gpu")  # 禁用GPU加速
-        options.add_argument("--disable-dev-shm-usage")  # 禁用共享内存
-
-        # 配置代理
-        if proxy_config and proxy_config.get('using'):
-            proxy_str = f"{proxy_config['protocol']}://{proxy_config['address']}:{proxy_config['port']}"
-            options.add_argument(f"--proxy-server={proxy_str}")
-            if proxy_config.get('username') and proxy_config.get('password'):
-                options.add_argument(f"--proxy-auth={proxy_config['username']}:{proxy_config['password']}")
-
-        service = Service(self.driver_path)
-        self.driver = webdriver.Edge(service=service, options=options)
+        self.result_quiet = result_quiet
+        # 最近若干次翻译结果的实际等待时间（秒）
+        self.result_wait_history = deque(maxlen=100)
+        self._last_result = None
+        self.session_mode = session_mode
+        self.session_ttl = session_ttl
+        # 会话状态：页面是否已加载可用、加载时间
+        self._page_ready = False
+        self._page_loaded_at = 0.0
+        # 翻译次数：总数，以及当前页面加载以来的次数，用于内存管理
+        self.translation_count = 0
+        self.page_translations = 0
+        # 页面加载统计：最近若干次加载的传输字节数和耗时，以及不屏蔽资源时的基准
+        self.block_resources = self.block_resources_by_default if block_resources is None else block_resources
+        self.load_history = deque(maxlen=100)
+        self.load_baseline = None
+        # 网络层读取翻译结果：仅在引擎提供了接口匹配规则时启用；
+        # 共享浏览器的性能日志混有所有标签页的事件，多标签页模式下只读取页面元素
+        self.network_capture = (capture_mode == 'network' and self.result_api_pattern is not None
+                                and browser_host is None)
+        self._result_api_re = re.compile(self.result_api_pattern) if self.network_capture else None
+        self._captured_requests = set()
+        self.metrics = metrics or default_recorder
+        self.engine_name = type(self).__name__
+        self.browser_host = browser_host
+
+        with self.metrics.span('browser_start', engine=self.engine_name):
+            if browser_host is not None:
+                self.driver = browser_host.open_tab()
+            else:
+                # 开启性能日志，用于接收 CDP Network 事件
+                options = build_edge_options(is_headless, proxy_config, performance_log=self.network_capture)
+                self.driver = webdriver.Edge(service=Service(self.driver_path), options=options)
 
         # 设置自定义请求头
         headers = {
@@ -50,160 +168,532 @@ class WebTranslator:
         }
         # 添加请求拦截器
         self.driver.execute_cdp_cmd('Network.setExtraHTTPHeaders', {'headers': headers})
+        # 屏蔽翻译用不到的资源，加快页面加载
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self._set_resource_blocking(self.block_resources)
+        self.injector = TextInjector(self.driver, self.inject_strategies)
         print("浏览器初始化成功")
 
-    def translate(self, text, web_timeout=5):
+    def translate(self, text, web_timeout=5, job=None):
         """执行翻译
 
         Args:
             text: 要翻译的文本
-            web_timeout: 等待网页加载的最大时间（秒）
+            web_timeout: 每次等待网页的最大时间（秒）
+            job: TranslationJob 实例，限制整体耗时并支持取消；各阶段之间检查任务状态，
+                每次等待都不超过任务的剩余时间
 
         Returns:
             翻译结果字符串或None
+
+        Raises:
+            JobCancelled: 任务被取消
+            JobDeadlineExceeded: 超过任务的截止时间
         """
 
         if not self.driver:
             print("错误: 浏览器未初始化")
             return None
 
+        job = job or TranslationJob()
+        tags = {'engine': self.engine_name, 'text_length': len(text)}
         try:
-            # 刷新页面
-            self.driver.get(self.url)
-
-            # 等待页面状态变为"complete"
-            WebDriverWait(self.driver, web_timeout).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
+            # 会话模式下复用已加载的页面，页面失效或过期时才重新加载
+            job.check('load_page')
+            if self.session_mode and self._is_page_alive():
+                with self.metrics.span('reset_input', **tags):
+                    self._reset_input(job.remaining(web_timeout))
+                previous_result = self._last_result
+            else:
+                with self.metrics.span('load_page', **tags):
+                    self._load_page(job.remaining(web_timeout), job.remaining())
+                previous_result = None
 
             # 定位输入框
-            input_element = WebDriverWait(self.driver, web_timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, self.input_csspath))
-            )
-
-            # 聚焦元素
-            self.driver.execute_script("arguments[0].focus();", input_element)
+            job.check('locate_input')
+            with self.metrics.span('locate_input', **tags):
+                input_element = WebDriverWait(self.driver, job.remaining(web_timeout)).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self.input_csspath))
+                )
+
+            # 在输入前安装结果观察器，以便捕获输出的每一次变化
+            self.driver.execute_script(_INSTALL_RESULT_OBSERVER_JS, self.output_csspath)
+            if self.network_capture:
+                # 丢弃之前积累的网络事件，只关注本次翻译的请求
+                self.driver.get_log('performance')
+                self._captured_requests.clear()
 
             # 输入文本
-            actions = ActionChains(self.driver)
-            actions.send_keys(text).perform()
-
-            # 等待翻译结果
-            output_element = WebDriverWait(self.driver, web_timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, self.output_csspath))
-            )
-            time.sleep(self.trans_result_wait + len(text) // 50)
-            result_text = output_element.text
-
-            # 定位清除输入按钮
-            clear_element = WebDriverWait(self.driver, web_timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, self.clear_csspath))
-            )
-            self.driver.execute_script("arguments[0].click();", clear_element)
+            job.check('inject')
+            with self.metrics.span('inject', **tags):
+                self.injector.inject(input_element, text)
+
+            # 等待翻译结果稳定
+            with self.metrics.span('wait_result', **tags):
+                result_text = self._wait_for_result(previous_result, web_timeout + len(text) // 50, job=job)
+            self._last_result = result_text
+            self.translation_count += 1
+            self.page_translations += 1
+
+            # 定位清除输入按钮，结果已经取得，不再检查任务状态；清除失败也返回结果，下次翻译时重新加载页面
+            try:
+                with self.metrics.span('clear', **tags):
+                    clear_element = WebDriverWait(self.driver, job.remaining(web_timeout)).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, self.clear_csspath))
+                    )
+                    self.driver.execute_script("arguments[0].click();", clear_element)
+            except Exception as e:
+                self._page_ready = False
+                print(f"清除输入失败: {str(e)}")
 
             return result_text
 
+        except JobAborted as e:
+            print(f"翻译已中止: {str(e)}")
+            self._abort_cleanup()
+            raise
+
         except Exception as e:
+            if job.cancelled or job.expired:
+                # 等待时间被任务的剩余时间截断（如 WebDriverWait 抛出 TimeoutException），按任务中止处理，
+                # 不算作翻译器出错
+                self._abort_cleanup()
+                try:
+                    job.check()
+                except JobAborted as aborted:
+                    print(f"翻译已中止: {str(aborted)}")
+                    raise aborted from e
+            # 页面状态未知，下次翻译时重新加载
+            self._page_ready = False
             print(f"翻译失败: {str(e)}")
             raise
 
+    def _wait_for_result(self, previous_result, timeout, poll_interval=0.05, job=None):
+        """等待翻译结果完成
+
+        结果需满足：非空、与安装观察器时输出区域中已有的文本（占位文字或旧的渲染结果）不同，
+        并且在 result_quiet 秒内保持不变。复用的会话页面上输出区域发生过变化、又显示出与之前相同的文本时，
+        视为翻译结果恰好与上一次相同。
+
+        Args:
+            previous_result: 上一次的翻译结果，新加载的页面传 None
+            timeout: 最长等待时间（秒）
+            poll_interval: 读取观察器状态的间隔（秒）
+            job: TranslationJob 实例，每次轮询前检查是否已取消或超时
+
+        Returns:
+            翻译结果字符串
+        """
+        quiet_ms = self.result_quiet * 1000
+        start = time.monotonic()
+        deadline = start + (job.remaining(timeout) if job else timeout)
+        try:
+            while True:
+                if job is not None:
+                    job.check('wait_result')
+                if self.network_capture:
+                    result = self._poll_network_result()
+                    if result:
+                        self.result_wait_history.append(time.monotonic() - start)
+                        return result
+
+                state = self.driver.execute_script(_POLL_RESULT_OBSERVER_JS)
+                if state and state['text'] and state['quiet'] >= quiet_ms and \
+                        (state['text'] != state['initial'] or (previous_result is not None and state['changes'] > 0)):
+                    self.result_wait_history.append(state['elapsed'] / 1000)
+                    return state['text']
+                if time.monotonic() >= deadline:
+                    if job is not None:
+                        job.check('wait_result')
+                    raise TimeoutException(f"等待翻译结果超时（{timeout} 秒）")
+                time.sleep(poll_interval)
+        finally:
+            try:
+                self.driver.execute_script(_REMOVE_RESULT_OBSERVER_JS)
+            except Exception:
+                pass
+
+    def _poll_network_result(self):
+        """从性能日志中查找已完成的翻译接口响应并解析结果，尚无结果时返回 None"""
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                if self._result_api_re.search(params['response']['url']):
+                    self._captured_requests.add(params['requestId'])
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._captured_requests:
+                self._captured_requests.discard(params['requestId'])
+                try:
+                    response = self.driver.execute_cdp_cmd('Network.getResponseBody',
+                                                           {'requestId': params['requestId']})
+                except Exception as e:
+                    print(f"读取翻译接口响应失败: {str(e)}")
+                    continue
+
+                body = response['body']
+                if response.get('base64Encoded'):
+                    body = base64.b64decode(body).decode('utf-8', errors='replace')
+                try:
+                    result = self.parse_result_payload(body)
+                except (ValueError, KeyError, TypeError, IndexError) as e:
+                    print(f"解析翻译接口响应失败: {str(e)}")
+                    continue
+                if result:
+                    return result
+        return None
+
+    def parse_result_payload(self, body):
+        """从翻译接口的响应体中解析翻译结果，由支持网络层读取的引擎实现
+
+        Returns:
+            翻译结果字符串，响应中没有结果时返回 None
+        """
+        return None
+
+    @property
+    def last_result_wait(self):
+        """最近一次翻译结果的等待时间（秒），尚未翻译时为 None"""
+        return self.result_wait_history[-1] if self.result_wait_history else None
+
+    def result_wait_stats(self):
+        """最近翻译结果等待时间的统计信息（秒）"""
+        waits = sorted(self.result_wait_history)
+        if not waits:
+            return {'count': 0}
+        return {
+            'count': len(waits),
+            'mean': sum(waits) / len(waits),
+            'median': median(waits),
+            'p90': waits[min(len(waits) - 1, int(len(waits) * 0.9))],
+            'max': waits[-1],
+        }
+
+    def _load_page(self, web_timeout, page_load_timeout=None):
+        """加载（或刷新）翻译页面，并等待页面状态变为 complete
+
+        Args:
+            web_timeout: 等待页面状态变为 complete 的最长时间（秒）
+            page_load_timeout: driver.get 的最长阻塞时间（秒），None 表示使用浏览器驱动的默认值
+        """
+        self._page_ready = False
+        start = time.perf_counter()
+        if self.browser_host is not None:
+            self.browser_host.load(self.driver, self.url, page_load_timeout)
+        else:
+            load_url(self.driver, self.url, page_load_timeout)
+        WebDriverWait(self.driver, web_timeout).until(
+            lambda driver: driver.execute_script("return document.readyState") == "complete"
+        )
+        self._page_ready = True
+        self._page_loaded_at = time.monotonic()
+        self.page_translations = 0
+        self._record_load_stats((time.perf_counter() - start) * 1000)
+
+    def blocked_url_patterns(self):
+        """当前引擎需要屏蔽的 URL 模式"""
+        return [pattern for category, patterns in BLOCKED_RESOURCES.items()
+                if category not in self.resource_allowlist for pattern in patterns]
+
+    def _set_resource_blocking(self, enabled):
+        urls = self.blocked_url_patterns() if enabled else []
+        self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': urls})
+
+    def _record_load_stats(self, elapsed_ms):
+        """记录一次页面加载的传输字节数和耗时，有基准时同时计算节省量"""
+        try:
+            stats = self.driver.execute_script(_LOAD_STATS_JS)
+        except Exception:
+            return None
+        stats['elapsed_ms'] = elapsed_ms
+        if self.load_baseline:
+            stats['bytes_saved'] = self.load_baseline['bytes'] - stats['bytes']
+            stats['ms_saved'] = self.load_baseline['elapsed_ms'] - elapsed_ms
+        self.load_history.append(stats)
+        return stats
+
+    @property
+    def last_load_stats(self):
+        """最近一次页面加载的统计信息，尚未加载时为 None"""
+        return self.load_history[-1] if self.load_history else None
+
+    def measure_resource_savings(self, web_timeout=15):
+        """分别在不屏蔽和屏蔽资源的情况下冷加载页面，测量资源屏蔽节省的字节数和耗时
+
+        测量结果作为基准保存，之后每次页面加载的统计中都会带上 bytes_saved 和 ms_saved。
+
+        Returns:
+            {'baseline': 不屏蔽时的统计, 'blocked': 屏蔽时的统计, 'bytes_saved': ..., 'ms_saved': ...}
+        """
+        measurements = {}
+        try:
+            for name, enabled in (('baseline', False), ('blocked', True)):
+                self._set_resource_blocking(enabled)
+                self.driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+                self.load_baseline = None
+                self._load_page(web_timeout)
+                measurements[name] = self.load_history.pop()
+        finally:
+            self._set_resource_blocking(self.block_resources)
+            self._page_ready = False
+
+        self.load_baseline = measurements['baseline']
+        measurements['bytes_saved'] = measurements['baseline']['bytes'] - measurements['blocked']['bytes']
+        measurements['ms_saved'] = measurements['baseline']['elapsed_ms'] - measurements['blocked']['elapsed_ms']
+        return measurements
+
+    def _is_page_alive(self):
+        """检查会话页面是否仍然可用：已加载、未过期、文档完整且输入框存在"""
+        if not self._page_ready:
+            return False
+        if self.session_ttl and time.monotonic() - self._page_loaded_at > self.session_ttl:
+            return False
+        try:
+            return bool(self.driver.execute_script(
+                "return document.readyState === 'complete' && document.querySelector(arguments[0]) !== null;",
+                self.input_csspath
+            ))
+        except Exception:
+            # 浏览器标签页崩溃、窗口关闭等情况
+            return False
+
+    def memory_usage(self):
+        """当前内存占用（字节），无法获取的项为 None
+
+        rss 为浏览器驱动及其子进程的常驻内存，需要 psutil；多标签页模式下浏览器进程由各标签页共享，不统计。
+        js_heap_used / js_heap_total 为当前页面的 JS 堆，来自 CDP Performance.getMetrics。
+        """
+        usage = {'engine': self.engine_name, 'rss': None, 'js_heap_used': None, 'js_heap_total': None,
+                 'page_translations': self.page_translations, 'translations': self.translation_count}
+        if not self.driver:
+            return usage
+        if self.browser_host is None:
+            usage['rss'] = process_tree_rss(self.browser_pid())
+        self.driver.execute_cdp_cmd('Performance.enable', {})
+        metrics = self.driver.execute_cdp_cmd('Performance.getMetrics', {})
+        values = {metric['name']: metric['value'] for metric in metrics.get('metrics', [])}
+        usage['js_heap_used'] = values.get('JSHeapUsedSize')
+        usage['js_heap_total'] = values.get('JSHeapTotalSize')
+        return usage
+
+    def browser_pid(self):
+        """浏览器驱动进程的 pid，浏览器由驱动进程启动，是它的子进程"""
+        process = getattr(getattr(self.driver, 'service', None), 'process', None)
+        return process.pid if process else None
+
+    def recycle_page(self):
+        """释放翻译页面占用的内存：跳转到空白页，下次翻译时重新加载页面"""
+        self._page_ready = False
+        self._last_result = None
+        self.page_translations = 0
+        self.driver.get('about:blank')
+
+    def ping(self):
+        """执行一条最简单的脚本，确认浏览器进程和当前页面仍在响应（供 translator_supervisor.heartbeat 使用）"""
+        if self.driver is None:
+            return False
+        if self.browser_host is not None:
+            return self.browser_host.ping(self.driver)
+        return self.driver.execute_script("return 1;") == 1
+
+    def _reset_input(self, web_timeout):
+        """清空会话页面中上一次残留的输入内容"""
+        remaining = self.driver.execute_script(
+            """
+            const el = document.querySelector(arguments[0]);
+            if (!el) return '';
+            return (typeof el.value === 'string') ? el.value : el.textContent;
+            """,
+            self.input_csspath
+        )
+        if not remaining or not remaining.strip():
+            return
+
+        clear_element = WebDriverWait(self.driver, web_timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, self.clear_csspath))
+        )
+        self.driver.execute_script("arguments[0].click();", clear_element)
+
+    def _abort_cleanup(self):
+        """翻译中止后把页面恢复到已知状态：停止未完成的加载、卸载结果观察器并清空输入
+
+        页面仍可用时保留会话，下次翻译无需重新加载；清理失败时下次翻译重新加载页面。
+        """
+        if not self._page_ready:
+            return
+        try:
+            self.driver.execute_script("window.stop();")
+            self.driver.execute_script(_REMOVE_RESULT_OBSERVER_JS)
+            if not self._is_page_alive():
+                self._page_ready = False
+                return
+            self._reset_input(1)
+            # 以当前输出为基准，避免把中止前残留的结果当作下一次翻译的结果
+            self._last_result = self.driver.execute_script(
+                "const el = document.querySelector(arguments[0]); return el ? el.innerText.trim() : null;",
+                self.output_csspath
+            ) or None
+        except Exception as e:
+            print(f"中止后清理页面失败: {str(e)}")
+            self._page_ready = False
+
     def quit(self):
-        """关闭浏览器"""
+        """关闭浏览器；多标签页模式下只关闭自己的标签页"""
         if self.driver:
-            self.driver.quit()
+            if self.browser_host is not None:
+                self.browser_host.close_tab(self.driver)
+            else:
+                self.driver.quit()
             self.driver = None
             print("浏览器已关闭")
 
 
 class BaiduTranslator(WebTranslator):
-    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None):
+    inject_strategies = ('cdp_insert_text', 'contenteditable_range', 'keystrokes')
+    max_text_length = 1000
+    result_api_pattern = r'fanyi\.baidu\.com/ait/text/translate'
+
+    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None, **kwargs):
         print('baidu translator')
         # 配置参数
         url = "https://fanyi.baidu.com/mtpe-individual/multimodal"
         input_csspath = '#editor-text > div.fAuuTI2d > div > div.Ssl84aLh > div > div > div > div > span > span > span'
         output_csspath = '#trans-selection > div > span'
         clear_csspath = '#editor-text > div.fAuuTI2d > div > div.Ssl84aLh > span'
-        trans_result_wait = 0.2
-        super().__init__(url, input_csspath, output_csspath, clear_csspath, trans_result_wait, driver_path, is_headless,
-                         proxy_config)
+        result_quiet = 0.2
+        super().__init__(url, input_csspath, output_csspath, clear_csspath, result_quiet, driver_path, is_headless,
+                         proxy_config, **kwargs)
+
+    def parse_result_payload(self, body):
+        # 接口以 SSE 流返回，每个 Translating 事件包含若干段落的译文
+        paragraphs = {}
+        for line in body.splitlines():
+            if not line.startswith('data:'):
+                continue
+            data = json.loads(line[len('data:'):]).get('data') or {}
+            if data.get('event') == 'Translating':
+                for item in data.get('list', []):
+                    paragraphs[item.get('paraIdx', len(paragraphs))] = item['dst']
+        return '\n'.join(paragraphs[i] for i in sorted(paragraphs)) or None
 
 
 class YoudaoTranslator(WebTranslator):
-    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None):
+    inject_strategies = ('cdp_insert_text', 'contenteditable_range', 'keystrokes')
+
+    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None, **kwargs):
         print('youdao translator')
         # 配置参数
         url = "https://fanyi.youdao.com/#/TextTranslate"
         input_csspath = '#js_fanyi_input'
         output_csspath = '#js_fanyi_output_resultOutput > p > span'
         clear_csspath = '#TextTranslate > div.source > div.text-translate-top-right > a'
-        trans_result_wait = 0.5
-        super().__init__(url, input_csspath, output_csspath, clear_csspath, trans_result_wait, driver_path, is_headless,
-                         proxy_config)
+        result_quiet = 0.3
+        super().__init__(url, input_csspath, output_csspath, clear_csspath, result_quiet, driver_path, is_headless,
+                         proxy_config, **kwargs)
 
 
 class TencentTranSmartTranslator(WebTranslator):
-    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None):
+    inject_strategies = ('native_value', 'cdp_insert_text', 'keystrokes')
+    max_text_length = 2000
+    result_api_pattern = r'transmart\.qq\.com/api/imt'
+
+    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None, **kwargs):
         print('tencent-transmart translator')
         # 配置参数
         url = "https://transmart.qq.com/zh-CN/index"
         input_csspath = '#ORIGINAL_TEXTAREA'
         output_csspath = '#root > div > div.src-routes--container__2sG4U > div > div:nth-child(1) > div:nth-child(2) > div.src-views-InteractiveTranslation-components-PanelTarget--container-content__24R3o > div.src-views-InteractiveTranslation-components-PanelTarget--content__1zYZJ > span.src-views-InteractiveTranslation-components-PanelTarget--content-sentence__viSNx.src-views-InteractiveTranslation-components-PanelTarget--active__1hbv3'
         clear_csspath = '#root > div > div.src-routes--container__2sG4U > div > div:nth-child(1) > div:nth-child(1) > div.src-views-InteractiveTranslation-components-PanelSource--container-textarea__2SIoV'
-        trans_result_wait = 0.5
-        super().__init__(url, input_csspath, output_csspath, clear_csspath, trans_result_wait, driver_path, is_headless,
-                         proxy_config)
+        result_quiet = 0.3
+        super().__init__(url, input_csspath, output_csspath, clear_csspath, result_quiet, driver_path, is_headless,
+                         proxy_config, **kwargs)
+
+    def parse_result_payload(self, body):
+        # 同一接口还用于语种识别等请求，只有翻译请求带 auto_translation 字段
+        translations = json.loads(body).get('auto_translation')
+        return '\n'.join(translations) if translations else None
 
 
 class CaiyunTranslator(WebTranslator):
-    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None):
+    inject_strategies = ('native_value', 'cdp_insert_text', 'keystrokes')
+
+    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None, **kwargs):
         print('caiyun translator')
         # 配置参数
         url = "https://fanyi.caiyunapp.com/"
         input_csspath = '#textarea'
         output_csspath = '#target_trans_0'
         clear_csspath = '#app > div > div > div.page-content > div.page-content-box > div > div > div.trans-action-box > div > div.two-column-layout > div:nth-child(1) > div > div.column-choose-langBox > img.closeImg'
-        trans_result_wait = 0.2
-        super().__init__(url, input_csspath, output_csspath, clear_csspath, trans_result_wait, driver_path, is_headless,
-                         proxy_config)
+        result_quiet = 0.2
+        super().__init__(url, input_csspath, output_csspath, clear_csspath, result_quiet, driver_path, is_headless,
+                         proxy_config, **kwargs)
 
 
 class AliTranslator(WebTranslator):
-    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None):
+    inject_strategies = ('native_value', 'cdp_insert_text', 'keystrokes')
+    result_api_pattern = r'translate\.alibaba\.com/api/translate/text'
+
+    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None, **kwargs):
         print('ali translator')
         # 配置参数
         url = "https://translate.alibaba.com/"
         input_csspath = '#source'
         output_csspath = '#pre'
         clear_csspath = '#root > div > div > div.smart-translation > div > div.tabs-content > div > div.example > div.translat-exhibit > div > div.original > div > span'
-        trans_result_wait = 0.3
-        super().__init__(url, input_csspath, output_csspath, clear_csspath, trans_result_wait, driver_path, is_headless,
-                         proxy_config)
+        result_quiet = 0.2
+        super().__init__(url, input_csspath, output_csspath, clear_csspath, result_quiet, driver_path, is_headless,
+                         proxy_config, **kwargs)
+
+    def parse_result_payload(self, body):
+        data = json.loads(body).get('data') or {}
+        return data.get('translateText') or None
 
 
 class GoogleTranslator(WebTranslator):
-    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None):
+    inject_strategies = ('native_value', 'cdp_insert_text', 'keystrokes')
+    # 清除按钮等控件使用图标字体
+    resource_allowlist = ('font',)
+
+    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None, **kwargs):
         print('google translator')
         # 配置参数
         url = "https://translate.google.com/"
         input_csspath = '#yDmH0d > c-wiz > div > div.ToWKne > c-wiz > div.OlSOob > c-wiz > div.ccvoYb > div.AxqVh > div.OPPzxe > div > c-wiz > span > span > div > textarea'
         output_csspath = '#yDmH0d > c-wiz > div > div.ToWKne > c-wiz > div.OlSOob > c-wiz > div.ccvoYb > div.AxqVh > div.OPPzxe > c-wiz > div > div.usGWQd > div > div.lRu31 > span.HwtZe > span > span'
         clear_csspath = '#yDmH0d > c-wiz > div > div.ToWKne > c-wiz > div.OlSOob > c-wiz > div.ccvoYb > div.AxqVh > div.OPPzxe > div > c-wiz > div.DVHrxd > span > button'
-        trans_result_wait = 1
-        super().__init__(url, input_csspath, output_csspath, clear_csspath, trans_result_wait, driver_path, is_headless,
-                         proxy_config)
+        result_quiet = 0.3
+        super().__init__(url, input_csspath, output_csspath, clear_csspath, result_quiet, driver_path, is_headless,
+                         proxy_config, **kwargs)
 
 
 class DeepLTranslator(WebTranslator):
-    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None):
+    inject_strategies = ('cdp_insert_text', 'contenteditable_range', 'keystrokes')
+    max_text_length = 1500
+
+    def __init__(self, driver_path, is_headless=False, proxy_config: Dict[str, Any] = None, **kwargs):
         print('deepl translator')
         # 配置参数
         url = "https://www.deepl.com/zh/translator"
         input_csspath = '#textareasContainer > div.rounded-es-inherit.relative.min-h-\[240px\].min-w-0.md\:min-h-\[clamp\(250px\,50vh\,557px\)\].mobile\:min-h-0.TextTranslatorLayout-module--textareaContainerMobilePortraitMaxHeight--50d46 > section > div > div.relative.flex-1.rounded-inherit.mobile\:min-h-0 > d-textarea > div:nth-child(1)'
         output_csspath = '#textareasContainer > div.rounded-ee-inherit.relative.min-h-\[240px\].min-w-0.md\:min-h-\[clamp\(250px\,50vh\,557px\)\].mobile\:min-h-0.mobile\:flex-1.max-\[768px\]\:min-h-\[375px\].TextTranslatorLayout-module--textareaContainerMobilePortraitMaxHeight--50d46 > section > div.relative.flex.flex-1.flex-col.rounded-inherit.mobile\:min-h-0 > d-textarea > div > p > span'
         clear_csspath = '#translator-source-clear-button'
-        trans_result_wait = 2
-        super().__init__(url, input_csspath, output_csspath, clear_csspath, trans_result_wait, driver_path, is_headless,
-                         proxy_config)
+        result_quiet = 0.6
+        super().__init__(url, input_csspath, output_csspath, clear_csspath, result_quiet, driver_path, is_headless,
+                         proxy_config, **kwargs)
+
+
+# 翻译引擎简称与翻译器类的对应关系，供命令行和服务模式使用
+TRANSLATORS = {
+    'baidu': BaiduTranslator,
+    'youdao': YoudaoTranslator,
+    'caiyun': CaiyunTranslator,
+    'ali': AliTranslator,
+    'tencent': TencentTranSmartTranslator,
+    'google': GoogleTranslator,
+    'deepl': DeepLTranslator,
+    # 免浏览器后端，仅在获取令牌时启动一次浏览器
+    'ali-http': AliHttpTranslator,
+}
 
 
 # 使用示例
@@ -221,18 +711,8 @@ if __name__ == "__main__":
     }
 
     # 定义翻译器配置
-    translator_classes = [
-        BaiduTranslator,
-        YoudaoTranslator,
-        CaiyunTranslator,
-        AliTranslator,
-        TencentTranSmartTranslator,
-        GoogleTranslator,
-        DeepLTranslator
-    ]
-
     # 轮流测试翻译器
-    for translator_class in translator_classes:
+    for translator_class in TRANSLATORS.values():
         print(f"\n=== 测试 {translator_class.__name__} ===")
 
         # 初始化单个翻译器
@@ -246,6 +726,9 @@ if __name__ == "__main__":
             # 翻译另一个文本
             result = translator.translate("Python自动化测试")
             print(f"翻译结果: {result}")
+            if isinstance(translator, WebTranslator):
+                print(f"结果等待统计: {translator.result_wait_stats()}")
+                print(f"页面加载统计: {translator.last_load_stats}")
 
         except Exception as e:
             print(f"测试 {translator_class.__name__} 时出错: {str(e)}")